@@ -0,0 +1,17 @@
+"""Сапер: движок без интерфейса и окно на tkinter.
+
+Движок импортируется без tkinter, окно - только при обращении
+к MinesweeperGUI.
+"""
+from .board import Board
+from .engine import MinesweeperGame
+from .solver import Solver
+
+__all__ = ["Board", "MinesweeperGame", "MinesweeperGUI", "Solver"]
+
+
+def __getattr__(name):
+    if name == "MinesweeperGUI":
+        from .gui import MinesweeperGUI
+        return MinesweeperGUI
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
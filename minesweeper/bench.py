@@ -0,0 +1,399 @@
+"""Замеры скорости движка и отрисовки с сохранением базовых результатов"""
+import argparse
+import json
+import os
+import pickle
+import random
+import sys
+import tempfile
+import time
+
+from . import replay, simulate, storage
+from .board import FLAG, HAS_NUMPY, MINE, REVEALED
+from .engine import ACTION_REVEAL, MinesweeperGame
+from .topology import TOPOLOGIES, neighbour_table
+
+
+class CountingCanvas:
+    """Заглушка Canvas для замеров без экрана: считает элементы и вызовы"""
+
+    def __init__(self, width, height):
+        self.options = {"width": str(width), "height": str(height)}
+        self.items = {}
+        self.last_item = 0
+        self.calls = 0
+
+    def __getitem__(self, option):
+        return self.options[option]
+
+    def create(self, *args, **kwargs):
+        self.calls += 1
+        self.last_item += 1
+        self.items[self.last_item] = kwargs.get("tags")
+        return self.last_item
+
+    create_image = create_rectangle = create_text = create
+
+    def delete(self, *items):
+        self.calls += 1
+        for item in items:
+            if item == "all":
+                self.items.clear()
+            elif isinstance(item, str):
+                for key in [key for key, tags in self.items.items() if tags == item]:
+                    del self.items[key]
+            else:
+                self.items.pop(item, None)
+
+    def itemconfig(self, *args, **kwargs):
+        self.calls += 1
+
+    def coords(self, *args):
+        self.calls += 1
+
+    def tag_raise(self, *args):
+        pass
+
+    def tag_lower(self, *args):
+        pass
+
+    def canvasx(self, x):
+        return x
+
+    def canvasy(self, y):
+        return y
+
+    def winfo_width(self):
+        return 1
+
+    def winfo_height(self):
+        return 1
+
+
+class StubLabel:
+    """Заглушка Label"""
+
+    def config(self, **options):
+        self.options = options
+
+
+class StubRoot:
+    """Заглушка Tk: кадр не откладывается до простоя, его рисует flush()"""
+
+    def after_idle(self, func):
+        return "idle"
+
+    def after_cancel(self, after_id):
+        pass
+
+
+class FlagVar:
+    """Заглушка BooleanVar"""
+
+    def __init__(self, value=False):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+def bench_gui(rows, cols, mines, real_tk=False):
+    """Интерфейс для замеров: настоящий Tk (нужен экран) или заглушка"""
+    from .gui import VIEW_CELLS, MinesweeperGUI
+
+    if real_tk:
+        gui = MinesweeperGUI()
+        gui.root.withdraw()
+        gui.rows, gui.cols, gui.mines = rows, cols, mines
+        gui.apply_difficulty()
+        return gui
+
+    gui = MinesweeperGUI.__new__(MinesweeperGUI)
+    gui.root = StubRoot()
+    gui.init_frames()
+    gui.rows, gui.cols, gui.mines = rows, cols, mines
+    gui.game = MinesweeperGame(rows, cols, mines)
+    gui.game.new_game()
+    size = gui.game.cell_size
+    gui.canvas = CountingCanvas(min(cols, VIEW_CELLS) * size, min(rows, VIEW_CELLS) * size)
+    gui.heat_map = FlagVar()
+    gui.heat = None
+    gui.mines_label = StubLabel()
+    gui.status_label = StubLabel()
+    gui.jobs = {}
+    gui.undo_stack = []
+    # Вместо картинок - имена состояний, рисовать их без экрана нечем
+    gui.tiles = {state: state for state in ["hidden", "flag", "mine", "exploded"] + list(range(9))}
+    gui.tile_size = size
+    return gui
+
+
+def mid_game(rows, cols, mines, seed, clicks):
+    """Позиция середины игры: первый клик и несколько случайных безопасных"""
+    random.seed(seed)
+    game = MinesweeperGame(rows, cols, mines)
+    game.new_game()
+    game.reveal(rows // 2, cols // 2)
+    for _ in range(clicks):
+        r, c = random.randrange(rows), random.randrange(cols)
+        if not game.field.is_mine(r, c):
+            game.reveal(r, c)
+    return game
+
+
+def fresh_game(rows, cols, mines, seed):
+    """Новая игра с разложенными минами, но без открытых клеток"""
+    random.seed(seed)
+    game = MinesweeperGame(rows, cols, mines)
+    game.new_game()
+    game.place_mines(rows // 2, cols // 2)
+    game.first_click = False
+    return game
+
+
+def nested_lists(game):
+    """Состояние игры вложенными списками, как оно хранилось до Board"""
+    return {
+        "rows": game.rows, "cols": game.cols, "mines": game.mines,
+        "board": [list(row) for row in game.board],
+        "visible": [list(row) for row in game.visible],
+        "flags": [list(row) for row in game.flags],
+    }
+
+
+def pickle_save(nested, path):
+    with open(path, "wb") as out:
+        pickle.dump(nested, out)
+
+
+def pickle_load(path):
+    with open(path, "rb") as source:
+        return pickle.load(source)
+
+
+def bench_cases(real_tk=False):
+    """Все замеры: имя -> (подготовка без замера, замеряемое действие)"""
+    cases = {}
+
+    for density in (0.05, 0.2, 0.35, 0.5):
+        for engine in ("python", "numpy") if HAS_NUMPY else ("python",):
+            def setup(density=density, engine=engine):
+                game = MinesweeperGame(200, 200, int(200 * 200 * density))
+                game.use_numpy = engine == "numpy"
+                game.new_game()
+                return game
+            cases[f"place_mines 200x200 {density:.0%} {engine}"] = (
+                setup, lambda game: game.place_mines(100, 100))
+
+    for size in (30, 200, 1000):
+        cases[f"reveal open {size}x{size}"] = (
+            lambda size=size: fresh_game(size, size, size * size // 100, 1),
+            lambda game, size=size: game.reveal(size // 2, size // 2))
+
+    # Таблица соседей строится один раз на форму поля, дальше берется из кэша
+    for topology in TOPOLOGIES:
+        cases[f"neighbour_table build 64x64 {topology}"] = (
+            neighbour_table.cache_clear, lambda _, topology=topology: neighbour_table(64, 64, topology))
+        cases[f"solver game 16x30 {topology}"] = (
+            lambda: None, lambda _, topology=topology: simulate.play_game(5, 16, 30, 99, topology=topology))
+
+    for rows, cols, mines, clicks in ((16, 30, 99, 5), (200, 200, 6000, 200), (1000, 1000, 150000, 3000)):
+        name = f"{rows}x{cols}"
+        cases[f"auto_flag mid-game {name}"] = (
+            lambda rows=rows, cols=cols, mines=mines, clicks=clicks: mid_game(rows, cols, mines, 2, clicks),
+            lambda game: game.auto_flag())
+        cases[f"get_hint mid-game {name}"] = (
+            lambda rows=rows, cols=cols, mines=mines, clicks=clicks: mid_game(rows, cols, mines, 2, clicks),
+            lambda game: game.get_hint())
+        cases[f"check_game_over+check_win {name}"] = (
+            lambda rows=rows, cols=cols, mines=mines, clicks=clicks: mid_game(rows, cols, mines, 2, clicks),
+            lambda game: (game.check_game_over(), game.check_win()))
+
+    # Сохранение: двоичный формат (3 бита на клетку) против pickle вложенных списков
+    path = os.path.join(tempfile.gettempdir(), "minesweeper-bench.msw")
+    pickled = os.path.join(tempfile.gettempdir(), "minesweeper-bench.pickle")
+    for rows, cols, mines, clicks in ((200, 200, 6000, 200), (1000, 1000, 150000, 3000)):
+        name = f"{rows}x{cols}"
+
+        def game(rows=rows, cols=cols, mines=mines, clicks=clicks):
+            return mid_game(rows, cols, mines, 2, clicks)
+
+        def saved(game=game):
+            state = game()
+            storage.save(state, path)
+            return state
+
+        def nested(game=game):
+            state = nested_lists(game())
+            pickle_save(state, pickled)
+            return state
+
+        cases[f"save binary {name}"] = (game, lambda game: storage.save(game, path))
+        cases[f"load binary {name}"] = (saved, lambda game: storage.load(path))
+        cases[f"open mapped {name}"] = (saved, lambda game: storage.open_mapped(path))
+        cases[f"save pickle nested lists {name}"] = (nested, lambda state: pickle_save(state, pickled))
+        cases[f"load pickle nested lists {name}"] = (nested, lambda state: pickle_load(pickled))
+
+    # 500 открытий безопасных клеток: по одному вызову с проверками и одной пачкой.
+    # Время почти одно и то же - пачка экономит обмены с сервером, а не работу движка
+    def safe_moves():
+        game = mid_game(200, 200, 6000, 2, 200)
+        data = game.field.data
+        cells = [i for i in range(len(data)) if not data[i] & (MINE | REVEALED | FLAG)]
+        return game, [(ACTION_REVEAL, *game.field.cell(i)) for i in random.Random(1).sample(cells, 500)]
+
+    def single_moves(state):
+        # Измененные клетки собираются, как их собирал бы интерфейс или сервер
+        game, moves = state
+        changed = []
+        for _, row, col in moves:
+            changed += game.reveal(row, col)
+            if game.check_game_over() or game.check_win():
+                break
+        return changed
+    cases["reveal x500 single calls 200x200"] = (safe_moves, single_moves)
+    cases["apply_moves x500 reveals 200x200"] = (safe_moves, lambda state: state[0].apply_moves(state[1]))
+
+    # Точка отката и откат хода против полной копии игры
+    for rows, cols, mines, clicks in ((200, 200, 6000, 200), (1000, 1000, 150000, 3000)):
+        name = f"{rows}x{cols}"
+
+        def probe_setup(rows=rows, cols=cols, mines=mines, clicks=clicks):
+            game = mid_game(rows, cols, mines, 2, clicks)
+            data = game.field.data
+            cell = next(i for i in range(len(data)) if not data[i] & (MINE | REVEALED | FLAG))
+            return game, game.field.cell(cell)
+
+        def probe(state):
+            # Ход "что если" по скрытой безопасной клетке и откат
+            game, cell = state
+            token = game.snapshot()
+            game.reveal(*cell)
+            game.restore(token)
+        cases[f"snapshot+reveal+restore {name}"] = (probe_setup, probe)
+        cases[f"copy game {name}"] = (
+            lambda rows=rows, cols=cols, mines=mines, clicks=clicks: mid_game(rows, cols, mines, 2, clicks),
+            lambda game: game.copy())
+
+    # Повтор журнала пакетного прогона (ходы, авто-флаги решателя и подсказки)
+    for rows, cols, mines in ((16, 30, 99), (200, 200, 6000)):
+        def logged(rows=rows, cols=cols, mines=mines):
+            return replay.loads(simulate.play_game(5, rows, cols, mines, log=True)["log"])
+        cases[f"replay solver game {rows}x{cols}"] = (logged, lambda log: replay.Replay(log).run())
+
+    # Бесконечное поле: блуждание бота с вытеснением кусков (в памяти 64 куска)
+    def endless_game():
+        from . import endless
+        game = endless.EndlessGame(seed=1, max_chunks=64)
+        game.reveal(0, 0)
+        return game
+
+    def endless_walk(game):
+        from . import endless
+        endless.walk(game, 10000, random.Random(2))
+    cases["endless walk 10000 steps"] = (endless_game, endless_walk)
+
+    presets = {
+        "beginner": (9, 9, 10),
+        "intermediate": (16, 16, 40),
+        "expert": (16, 30, 99),
+        "custom 200x200": (200, 200, 6000),
+        "custom 1000x1000": (1000, 1000, 150000),
+    }
+    for name, (rows, cols, mines) in presets.items():
+        def setup(rows=rows, cols=cols, mines=mines):
+            gui = bench_gui(rows, cols, mines, real_tk)
+            random.seed(3)
+            gui.game.reveal(rows // 2, cols // 2)
+            return gui
+        cases[f"draw_board full {name}"] = (setup, lambda gui: gui.draw_board())
+
+        def setup_flag(setup=setup):
+            gui = setup()
+            gui.draw_board()
+            return gui
+
+        def toggle(gui):
+            row, col = next(cell for cell in gui.cell_items if gui.cell_states[cell] in ("hidden", "flag"))
+            gui.finish_move(gui.game.toggle_flag(row, col))
+            gui.flush()
+        cases[f"draw flag toggle {name}"] = (setup_flag, toggle)
+
+        def burst(gui):
+            # 50 ходов подряд до простоя Tk - один кадр
+            cells = [cell for cell in gui.cell_items if gui.cell_states[cell] in ("hidden", "flag")]
+            for row, col in cells[:50]:
+                gui.finish_move(gui.game.toggle_flag(row, col))
+            gui.flush()
+        cases[f"draw flag burst x50 {name}"] = (setup_flag, burst)
+
+    return cases
+
+
+def measure(setup, run, repeat, warmup):
+    """Время run() в секундах по repeat повторам после warmup прогонов"""
+    times = []
+    extra = {}
+    for n in range(warmup + repeat):
+        state = setup()
+        canvas = getattr(state, "canvas", None)
+        calls = getattr(canvas, "calls", 0)
+        started = time.perf_counter()
+        run(state)
+        elapsed = time.perf_counter() - started
+        if n >= warmup:
+            times.append(elapsed)
+        if isinstance(canvas, CountingCanvas):
+            extra = {"canvas_items": len(canvas.items), "canvas_calls": canvas.calls - calls}
+    times.sort()
+    return dict({
+        "median_ms": round(times[len(times) // 2] * 1000, 4),
+        "p95_ms": round(times[min(len(times) - 1, int(len(times) * 0.95))] * 1000, 4),
+        "min_ms": round(times[0] * 1000, 4),
+        "repeat": repeat,
+    }, **extra)
+
+
+def main(argv):
+    """python -m minesweeper bench ... - замеры горячих мест движка и отрисовки"""
+    parser = argparse.ArgumentParser(prog="minesweeper bench", description="Замеры скорости")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--filter", default="", help="только замеры, в имени которых есть эта строка")
+    parser.add_argument("--save", help="сохранить результаты как базовые в JSON")
+    parser.add_argument("--compare", help="сравнить с базовыми результатами из JSON")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="во сколько раз медиана может вырасти, пока это не регрессия")
+    parser.add_argument("--tk", action="store_true", help="рисовать на настоящем Tk (нужен экран)")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+    for name, (setup, run) in bench_cases(args.tk).items():
+        if args.filter not in name:
+            continue
+        result = measure(setup, run, args.repeat, args.warmup)
+        results[name] = result
+
+        line = f"{name:45s} median {result['median_ms']:10.3f} ms   p95 {result['p95_ms']:10.3f} ms"
+        if "canvas_items" in result:
+            line += f"   items {result['canvas_items']:6d}   calls {result['canvas_calls']:6d}"
+        if name in baseline:
+            ratio = result["median_ms"] / max(baseline[name]["median_ms"], 1e-6)
+            line += f"   x{ratio:.2f}"
+            if ratio > args.threshold:
+                line += "  РЕГРЕССИЯ"
+                regressions.append(name)
+        print(line, flush=True)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+    if regressions:
+        print(f"Регрессий: {len(regressions)}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,156 @@
+"""Хранение поля: один байт на клетку, состояние клетки в битах"""
+import importlib.util
+
+from .topology import FLAT, neighbour_table
+
+# NumPy не обязателен: здесь только проверяем, что он установлен,
+# а импортируем при первом использовании, чтобы не замедлять запуск
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+
+def numpy():
+    """Модуль NumPy (импортируется при первом вызове)"""
+    import numpy
+    return numpy
+
+
+# Биты клетки в Board.data
+COUNT_MASK = 0x0F  # количество мин вокруг (0-8)
+MINE = 0x10
+REVEALED = 0x20
+FLAG = 0x40
+
+# Таблица для bytes.translate: 1 для скрытой клетки без флага
+HIDDEN_TABLE = bytes(int(b & (REVEALED | FLAG) == 0) for b in range(256))
+
+
+# Таблицы для bytes.translate: байт клетки -> символ "1"/"0" по биту
+BIT_TABLES = {}
+
+
+def pack_bits(data, mask):
+    """Один бит на клетку (1, если у клетки есть бит mask), по 8 клеток в байте.
+    Клетка i - бит 0x80 >> (i % 8) байта i // 8, как в numpy.packbits"""
+    table = BIT_TABLES.get(mask)
+    if table is None:
+        table = BIT_TABLES[mask] = bytes(b"01"[bool(b & mask)] for b in range(256))
+    if not data:
+        return b""
+    # int() читает двоичную строку за линейное время, без цикла в Python
+    bits = int(data.translate(table), 2) << (-len(data) % 8)
+    return bits.to_bytes((len(data) + 7) // 8, "big")
+
+
+def positions(marks):
+    """Индексы единиц в результате translate"""
+    found = []
+    i = marks.find(1)
+    while i != -1:
+        found.append(i)
+        i = marks.find(1, i + 1)
+    return found
+
+
+class Board:
+    """Все поле в одном bytearray: один байт на клетку, состояние в битах"""
+    __slots__ = ("rows", "cols", "data", "topology", "table")
+
+    def __init__(self, rows, cols, topology=FLAT):
+        self.rows = rows
+        self.cols = cols
+        self.data = bytearray(rows * cols)
+        # table[i] - кортеж соседей клетки i, общий для всех полей этой формы
+        self.topology = topology
+        self.table = neighbour_table(rows, cols, topology)
+
+    def index(self, row, col):
+        return row * self.cols + col
+
+    def cell(self, index):
+        return divmod(index, self.cols)
+
+    def value(self, row, col):
+        """-1 = мина, 0-8 = количество мин вокруг"""
+        bits = self.data[row * self.cols + col]
+        return -1 if bits & MINE else bits & COUNT_MASK
+
+    def is_mine(self, row, col):
+        return bool(self.data[row * self.cols + col] & MINE)
+
+    def is_revealed(self, row, col):
+        return bool(self.data[row * self.cols + col] & REVEALED)
+
+    def is_flagged(self, row, col):
+        return bool(self.data[row * self.cols + col] & FLAG)
+
+    def neighbours(self, index):
+        """Индексы соседей клетки (в горячих циклах - сразу self.table[index])"""
+        return self.table[index]
+
+    def copy(self):
+        """Независимая копия поля"""
+        field = Board.__new__(Board)
+        field.rows, field.cols, field.topology, field.table = self.rows, self.cols, self.topology, self.table
+        field.data = bytearray(self.data)
+        return field
+
+    def packed(self, mask):
+        """Битовая карта клеток с битом mask (см. pack_bits)"""
+        return pack_bits(self.data, mask)
+
+    def array(self):
+        """Поле как массив NumPy rows x cols поверх того же bytearray"""
+        np = numpy()
+        return np.frombuffer(self.data, dtype=np.uint8).reshape(self.rows, self.cols)
+
+
+class BoardLayer:
+    """Доступ вида layer[r][c] к одному слою Board (для старого кода)"""
+    __slots__ = ("field", "bit")
+
+    def __init__(self, field, bit):
+        self.field = field
+        self.bit = bit
+
+    def __len__(self):
+        return self.field.rows
+
+    def __getitem__(self, row):
+        return BoardRow(self.field, self.bit, row * self.field.cols)
+
+    def __iter__(self):
+        for row in range(self.field.rows):
+            yield self[row]
+
+
+class BoardRow:
+    __slots__ = ("field", "bit", "start")
+
+    def __init__(self, field, bit, start):
+        self.field = field
+        self.bit = bit
+        self.start = start
+
+    def __len__(self):
+        return self.field.cols
+
+    def __getitem__(self, col):
+        bits = self.field.data[self.start + col]
+        if self.bit is None:
+            return -1 if bits & MINE else bits & COUNT_MASK
+        return bool(bits & self.bit)
+
+    def __iter__(self):
+        # Без этого итерация шла бы по __getitem__ дальше конца строки
+        for col in range(self.field.cols):
+            yield self[col]
+
+    def __setitem__(self, col, value):
+        data = self.field.data
+        i = self.start + col
+        if self.bit is None:
+            data[i] = (data[i] & (REVEALED | FLAG)) | (MINE if value == -1 else value)
+        elif value:
+            data[i] |= self.bit
+        else:
+            data[i] &= ~self.bit
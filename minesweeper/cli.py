@@ -0,0 +1,82 @@
+"""Командная строка: python -m minesweeper [--profile FILE] [--cprofile FILE] [gui|play-headless|replay|serve|loadtest|endless|bench] ..."""
+import argparse
+import sys
+
+
+def run_gui():
+    """Запуск игры в окне (tkinter импортируется только здесь)"""
+    from . import profiling
+    from .gui import MinesweeperGUI
+
+    profiling.instrument_gui(MinesweeperGUI)
+
+    print("=" * 50)
+    print("ИГРА 'САПЕР'")
+    print("=" * 50)
+    print("Управление:")
+    print("• Левый клик - открыть клетку")
+    print("• Правый клик - поставить/снять флаг")
+    print("• Средний клик или обе кнопки - аккорд (открыть соседей числа с флагами)")
+    print("• H - подсказка (клетка с наименьшей вероятностью мины)")
+    print("• F - авто-флаги (расставить флаги и открыть безопасные клетки)")
+    print("• F2 - новая игра")
+    print("• В меню 'Сложность' - выбор уровня сложности")
+    print("=" * 50)
+
+    app = MinesweeperGUI()
+    app.run()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="minesweeper", description="Игра 'Сапер'")
+    parser.add_argument("command", nargs="?", default="gui", choices=["gui", "play-headless", "replay", "serve", "loadtest", "endless", "bench"],
+                        help="gui - игра в окне, play-headless - пакетный прогон ботом, "
+                             "replay - повтор журналов ходов, serve - сервер игр, "
+                             "loadtest - нагрузка на сервер, endless - бесконечное поле, bench - замеры")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="параметры команды (см. COMMAND --help)")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="замерять движок и отрисовку, при выходе записать сводку в JSON")
+    parser.add_argument("--cprofile", metavar="FILE",
+                        help="прогнать команду под cProfile и записать статистику для pstats")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    if args.profile:
+        from . import profiling
+        profiling.enable(args.profile)
+
+    if args.cprofile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            run(args)
+        finally:
+            profiler.disable()
+            profiler.dump_stats(args.cprofile)
+    else:
+        run(args)
+
+
+def run(args):
+    """Выполнить выбранную команду"""
+    if args.command == "gui":
+        run_gui()
+    elif args.command == "play-headless":
+        from . import simulate
+        simulate.main(args.args)
+    elif args.command == "replay":
+        from . import replay
+        replay.main(args.args)
+    elif args.command == "serve":
+        from . import server
+        server.main(args.args)
+    elif args.command == "loadtest":
+        from . import loadtest
+        loadtest.main(args.args)
+    elif args.command == "endless":
+        from . import endless, profiling
+        profiling.instrument_endless(endless.EndlessGame)
+        endless.main(args.args)
+    elif args.command == "bench":
+        from . import bench
+        bench.main(args.args)
@@ -0,0 +1,317 @@
+"""Бесконечное поле: мир делится на куски CHUNK x CHUNK клеток.
+
+Мины куска расставляются при первом обращении к нему - по хэшу (номер
+мира, координаты куска), поэтому кусок всегда можно построить заново, а
+числа на краях сшиваются по минам соседних кусков. В памяти держится не
+больше max_chunks кусков (LRU): нетронутый кусок при вытеснении просто
+выбрасывается, а сыгранный сжимается до битов открытых клеток и флагов
+(zlib) и при следующем обращении строится заново поверх них.
+
+Клетки адресуются целыми row, col любого знака; первый ход - в (0, 0),
+вокруг него мин нет. Игра идет до первой открытой мины, очки - число
+открытых клеток.
+"""
+import argparse
+import hashlib
+import json
+import random
+import sys
+import time
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+
+from .board import COUNT_MASK, FLAG, MINE, REVEALED
+from .topology import neighbour_table
+
+# Сторона куска (степень двойки - кусок клетки ищется сдвигом)
+CHUNK_SHIFT = 5
+CHUNK = 1 << CHUNK_SHIFT
+CHUNK_MASK = CHUNK - 1
+CHUNK_CELLS = CHUNK * CHUNK
+
+# Кусок с рамкой в одну клетку из соседних кусков - для подсчета чисел
+PADDED = CHUNK + 2
+
+# Сколько кусков держать в памяти и сколько карт мин соседей помнить
+MAX_CHUNKS = 256
+MINES_CACHE_SIZE = 64
+
+# Плотность мин: около 0.1 пустые области сливаются и одно открытие
+# уходит на сотни тысяч клеток; при 0.12 - в среднем ~500 клеток
+DENSITY = 0.16
+MIN_DENSITY = 0.12
+MAX_DENSITY = 0.5
+
+# Таблица для translate: байт клетки -> только биты хода игрока
+STATE_TABLE = bytes(b & (REVEALED | FLAG) for b in range(256))
+
+# Соседи клетки (сдвиги строки и столбца)
+AROUND = tuple((dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc)
+
+
+@lru_cache(maxsize=MINES_CACHE_SIZE)
+def chunk_mines(seed, mines, cr, cc):
+    """Мины куска (cr, cc): кортеж индексов клеток внутри куска"""
+    key = b"%d:%d:%d" % (seed, cr, cc)
+    rng = random.Random(int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little"))
+    cells = range(CHUNK_CELLS)
+    if cr in (-1, 0) and cc in (-1, 0):
+        # Куски у начала координат: без мин вокруг первого хода (0, 0)
+        top, left = cr * CHUNK, cc * CHUNK
+        cells = [i for i in cells
+                 if abs(top + (i >> CHUNK_SHIFT)) > 1 or abs(left + (i & CHUNK_MASK)) > 1]
+    return tuple(sorted(rng.sample(cells, mines)))
+
+
+class EndlessGame:
+    """Игра на бесконечном поле из кусков"""
+
+    def __init__(self, seed=None, density=DENSITY, max_chunks=MAX_CHUNKS):
+        if not MIN_DENSITY <= density <= MAX_DENSITY:
+            raise ValueError(f"плотность мин от {MIN_DENSITY} до {MAX_DENSITY}")
+        self.seed = random.getrandbits(63) if seed is None else seed
+        self.density = density
+        self.chunk_mine_count = round(CHUNK_CELLS * density)
+        self.max_chunks = max_chunks
+
+        self.chunks = OrderedDict()  # (cr, cc) -> bytearray клеток, от давних к свежим
+        self.cold = {}  # (cr, cc) -> сжатые биты открытых клеток и флагов
+        self.dirty = set()  # куски, измененные после загрузки
+
+        self.revealed_count = 0
+        self.flag_count = 0
+        self.exploded = None  # (row, col) открытой мины
+        self.game_over = False
+
+        # Счетчики кусков: построено (впервые / заново), вытеснено, время
+        self.generated = 0
+        self.reloaded = 0
+        self.dropped = 0
+        self.compressed = 0
+        self.cold_bytes = 0
+        self.generate_time = 0.0
+        self.evict_time = 0.0
+
+    # Куски
+
+    def load_chunk(self, key):
+        """Построить кусок: мины по хэшу, числа с учетом соседних кусков,
+        поверх - сохраненные ходы, если кусок уже вытеснялся"""
+        started = time.perf_counter()
+        cr, cc = key
+        seed, mines = self.seed, self.chunk_mine_count
+        table = neighbour_table(PADDED, PADDED)
+        padded = bytearray(PADDED * PADDED)
+        own = []
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                top, left = dr * CHUNK + 1, dc * CHUNK + 1
+                for i in chunk_mines(seed, mines, cr + dr, cc + dc):
+                    r, c = top + (i >> CHUNK_SHIFT), left + (i & CHUNK_MASK)
+                    if 0 <= r < PADDED and 0 <= c < PADDED:
+                        p = r * PADDED + c
+                        for j in table[p]:
+                            padded[j] += 1
+                        if not dr and not dc:
+                            own.append(p)
+        # Клетки самих мин перезаписываем, как в MinesweeperGame.lay_mines
+        for p in own:
+            padded[p] = MINE
+
+        data = bytearray(CHUNK_CELLS)
+        for r in range(CHUNK):
+            start = (r + 1) * PADDED + 1
+            data[r * CHUNK:(r + 1) * CHUNK] = padded[start:start + CHUNK]
+
+        state = self.cold.get(key)
+        if state is None:
+            self.generated += 1
+        else:
+            moves = zlib.decompress(state)
+            data[:] = (int.from_bytes(data, "big") | int.from_bytes(moves, "big")).to_bytes(CHUNK_CELLS, "big")
+            self.reloaded += 1
+        self.chunks[key] = data
+        self.generate_time += time.perf_counter() - started
+        return data
+
+    def chunk(self, row, col):
+        """Кусок клетки и индекс клетки в нем"""
+        key = (row >> CHUNK_SHIFT, col >> CHUNK_SHIFT)
+        data = self.chunks.get(key)
+        if data is None:
+            data = self.load_chunk(key)
+        return data, (row & CHUNK_MASK) * CHUNK + (col & CHUNK_MASK)
+
+    def trim(self):
+        """Вытеснить давние куски сверх max_chunks, возвращает сколько вытеснено.
+        Измененные куски должны быть уже в dirty - иначе ходы в них потеряются"""
+        excess = len(self.chunks) - self.max_chunks
+        if excess <= 0:
+            return 0
+        started = time.perf_counter()
+        for _ in range(excess):
+            key, data = self.chunks.popitem(last=False)
+            if key in self.dirty:
+                self.dirty.discard(key)
+                state = zlib.compress(data.translate(STATE_TABLE), 1)
+                self.cold_bytes += len(state) - len(self.cold.get(key, b""))
+                self.cold[key] = state
+                self.compressed += 1
+            else:
+                self.dropped += 1
+        self.evict_time += time.perf_counter() - started
+        return excess
+
+    def touch(self, keys):
+        """Отметить куски хода как свежие и вытеснить лишние"""
+        for key in keys:
+            if key in self.chunks:
+                self.chunks.move_to_end(key)
+        self.trim()
+
+    # Ходы
+
+    def cell(self, row, col):
+        """Байт клетки (биты как в board.py)"""
+        data, i = self.chunk(row, col)
+        return data[i]
+
+    def reveal(self, row, col):
+        """Открыть клетку (пустые области - через границы кусков),
+        возвращает список открытых клеток (row, col).
+        Большая пустая область вытесняет давние куски прямо по ходу заливки:
+        в памяти остаются не больше max_chunks кусков, а кусок, куда заливка
+        вернется, строится заново вместе с уже открытыми клетками"""
+        if self.game_over:
+            return []
+        opened = []
+        touched = set()
+        chunks, load, dirty = self.chunks, self.load_chunk, self.dirty
+        closed = REVEALED | FLAG
+        stack = [(row, col)]
+        current = data = None
+        while stack:
+            r, c = stack.pop()
+            key = (r >> CHUNK_SHIFT, c >> CHUNK_SHIFT)
+            if key != current:
+                # Переход в другой кусок: он становится свежим, лишние - вон
+                current = key
+                data = chunks.get(key)
+                if data is None:
+                    data = load(key)
+                    self.trim()
+                else:
+                    chunks.move_to_end(key)
+            i = (r & CHUNK_MASK) * CHUNK + (c & CHUNK_MASK)
+            value = data[i]
+            if value & closed:
+                continue
+            data[i] = value | REVEALED
+            # Заново построенный кусок мог уже выйти из dirty - отмечаем всегда
+            touched.add(key)
+            dirty.add(key)
+            opened.append((r, c))
+            if value & MINE:
+                self.exploded = (r, c)
+                self.game_over = True
+                continue
+            self.revealed_count += 1
+            if not value & COUNT_MASK:
+                stack.extend((r + dr, c + dc) for dr, dc in AROUND)
+        self.touch(touched)
+        return opened
+
+    def toggle_flag(self, row, col):
+        """Поставить или снять флаг, возвращает список измененных клеток"""
+        if self.game_over:
+            return []
+        data, i = self.chunk(row, col)
+        if data[i] & REVEALED:
+            return []
+        data[i] ^= FLAG
+        self.flag_count += 1 if data[i] & FLAG else -1
+        key = (row >> CHUNK_SHIFT, col >> CHUNK_SHIFT)
+        self.dirty.add(key)
+        self.touch((key,))
+        return [(row, col)]
+
+    def window(self, row, col, rows, cols):
+        """Байты клеток прямоугольника (для отрисовки), по строкам"""
+        out = bytearray()
+        for r in range(row, row + rows):
+            for c in range(col, col + cols):
+                out.append(self.cell(r, c))
+        self.trim()
+        return out
+
+    def stats(self):
+        """Счетчики кусков и память"""
+        built = self.generated + self.reloaded
+        evicted = self.compressed + self.dropped
+        return {
+            "live_chunks": len(self.chunks),
+            "live_bytes": len(self.chunks) * CHUNK_CELLS,
+            "cold_chunks": len(self.cold),
+            "cold_bytes": self.cold_bytes,
+            "generated": self.generated,
+            "reloaded": self.reloaded,
+            "compressed": self.compressed,
+            "dropped": self.dropped,
+            "generate_ms": round(self.generate_time / built * 1000, 4) if built else None,
+            "evict_ms": round(self.evict_time / evicted * 1000, 4) if evicted else None,
+        }
+
+
+def walk(game, steps, rng, row=0, col=0, stride=6, flag_share=0.05):
+    """Нагрузочный бот: случайное блуждание по миру от (row, col), открывает
+    клетки без мин, на мины иногда ставит флаг (мины он видит - это не
+    игрок, а проверка памяти и кусков на долгой игре). Возвращает, где остановился"""
+    for _ in range(steps):
+        row += rng.randint(-stride, stride)
+        col += rng.randint(-stride, stride)
+        value = game.cell(row, col)
+        if value & (REVEALED | FLAG):
+            continue
+        if value & MINE:
+            if rng.random() < flag_share:
+                game.toggle_flag(row, col)
+            continue
+        game.reveal(row, col)
+    return row, col
+
+
+def main(argv):
+    """python -m minesweeper endless ... - долгая игра бота на бесконечном поле"""
+    parser = argparse.ArgumentParser(prog="minesweeper endless",
+                                     description="Бесконечное поле: прогон бота и счетчики кусков")
+    parser.add_argument("--seed", type=int, default=0, help="номер мира")
+    parser.add_argument("--density", type=float, default=DENSITY)
+    parser.add_argument("--max-chunks", type=int, default=MAX_CHUNKS,
+                        help="сколько кусков держать в памяти")
+    parser.add_argument("--steps", type=int, default=200000)
+    parser.add_argument("--report-every", type=int, default=50000,
+                        help="через сколько шагов печатать счетчики")
+    args = parser.parse_args(argv)
+    try:
+        import resource  # пиковая память процесса - только на Unix
+    except ImportError:
+        resource = None
+
+    game = EndlessGame(args.seed, args.density, args.max_chunks)
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    game.reveal(0, 0)
+    row = col = done = 0
+    while done < args.steps:
+        batch = min(args.report_every, args.steps - done)
+        row, col = walk(game, batch, rng, row, col)
+        done += batch
+        report = {"steps": done, "revealed": game.revealed_count,
+                  "time": round(time.perf_counter() - started, 3)}
+        report.update(game.stats())
+        if resource is not None:
+            report["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        print(json.dumps(report), flush=True)
+    if game.game_over:
+        print(f"Открыта мина {game.exploded}", file=sys.stderr)
@@ -0,0 +1,657 @@
+"""Игровой движок сапера без интерфейса"""
+import copy
+import hashlib
+import random
+import time
+from array import array
+
+from .board import (
+    COUNT_MASK, FLAG, HAS_NUMPY, HIDDEN_TABLE, MINE, REVEALED,
+    Board, BoardLayer, numpy, positions,
+)
+from .topology import FLAT, TORUS
+from .solver import EXACT_COMBINE_LIMIT, Solver, combine_approximate, combine_exact, component_solutions
+
+# С какого размера поля мины раскладывает NumPy: на маленьких полях
+# обычный Python быстрее, чем импорт NumPy
+NUMPY_MIN_CELLS = 4096
+
+# Виды ходов в журнале: событие хранится одним числом клетка * 4 + вид
+MOVE_REVEAL = 0
+MOVE_FLAG = 1
+MOVE_HINT = 2
+MOVE_AUTO = 3
+
+# Действия для apply_moves (аккорд в журнал пишется открытыми им клетками)
+ACTION_REVEAL = "reveal"
+ACTION_FLAG = "flag"
+ACTION_CHORD = "chord"
+ACTIONS = (ACTION_REVEAL, ACTION_FLAG, ACTION_CHORD)
+
+# Итог игры (result)
+PLAYING = "playing"
+WON = "won"
+LOST = "lost"
+
+# Записи журнала изменений (для отката к snapshot)
+UNDO_PLACE = 0  # (вид,) - расстановка мин
+UNDO_REVEAL = 1  # (вид, открытые клетки, снятые с safe_cells, добавленные в pending)
+UNDO_FLAG = 2  # (вид, клетка, добавленные в frontier, добавленные в pending, прежние safe_cells)
+UNDO_SOLVE = 3  # (вид, прежние pending, убранные из frontier, флаги, новые safe_cells)
+UNDO_SHOW = 4  # (вид, открытые мины)
+
+# Таблица для bytes.translate: от клетки остается только флаг
+FLAG_ONLY_TABLE = bytes(b & FLAG for b in range(256))
+
+
+class MinesweeperGame:
+    def __init__(self, rows=9, cols=9, mines=10, seed=None, rng=None, topology=FLAT):
+        self.rows = rows
+        self.cols = cols
+        self.mines = mines
+        self.cell_size = 35
+        self.topology = topology  # FLAT или TORUS (края склеены), см. topology.py
+
+        # Номер поля: одинаковые seed, размер, число мин и первый клик дают
+        # одинаковое поле. Вместо номера можно передать свой random.Random
+        self.seed = seed
+        self.rng = rng
+        self.seed_used = False
+
+        # Игровое поле
+        self.field = Board(rows, cols, topology)
+
+        # Состояние игры
+        self.game_over = False
+        self.game_started = False
+        self.first_click = True
+        self.start_time = 0
+        self.revealed_count = 0
+
+        # Индексы, которые обновляются на каждом ходу, чтобы не сканировать поле
+        self.mine_cells = []  # индексы всех мин
+        self.exploded = None  # индекс открытой мины
+        self.flag_count = 0
+        self.hidden_count = rows * cols  # скрытые клетки без флага
+        self.frontier = set()  # открытые числа, у которых еще есть скрытые соседи
+        self.pending = set()  # числа границы, которые решатель должен перепроверить
+        self.safe_cells = set()  # доказанно безопасные, но еще не открытые клетки
+
+        # Журнал ходов с начала игры (для повтора, см. replay.py)
+        self.moves = array("Q")
+
+        # Журнал изменений поля для отката (None - не ведется, см. snapshot)
+        self.journal = None
+
+        # Цвета
+        self.colors = {
+            "hidden": "#CCCCCC",
+            "revealed": "#cfa5a5",
+            "grid": "#808080",
+            "1": "blue",
+            "2": "green",
+            "3": "red",
+            "4": "darkblue",
+            "5": "darkred",
+            "6": "cyan",
+            "7": "black",
+            "8": "gray",
+            "mine": "black",
+            "flag": "red",
+            "exploded": "red"
+        }
+
+        # Дополнительные функции
+        self.hint_available = True
+        self.auto_flag_enabled = False
+        self.use_numpy = HAS_NUMPY and rows * cols >= NUMPY_MIN_CELLS
+        self.no_guess = False  # поля, которые решаются без угадывания
+        self.no_guess_budget = None  # сколько секунд искать такое поле (None - без предела)
+        self.pool = None  # пул готовых полей без угадывания (BoardPool)
+
+    @property
+    def board(self):
+        """-1 = мина, 0-8 = количество мин вокруг"""
+        return BoardLayer(self.field, None)
+
+    @property
+    def visible(self):
+        """False = скрыто, True = открыто"""
+        return BoardLayer(self.field, REVEALED)
+
+    @property
+    def flags(self):
+        """True = флаг"""
+        return BoardLayer(self.field, FLAG)
+
+    def copy(self):
+        """Копия игры со своим полем и индексами (например, для анализа в другом потоке)"""
+        game = copy.copy(self)
+        game.field = self.field.copy()
+        game.mine_cells = list(self.mine_cells)
+        game.frontier = set(self.frontier)
+        game.pending = set(self.pending)
+        game.safe_cells = set(self.safe_cells)
+        game.moves = array("Q", self.moves)
+        if self.journal is not None:
+            game.journal = list(self.journal)
+        return game
+
+    def new_game(self, seed=None):
+        """Новая игра (seed - номер поля, по умолчанию новый случайный)"""
+        self.field = Board(self.rows, self.cols, self.topology)
+
+        # Номер из конструктора годится только для первой игры
+        if seed is not None:
+            self.seed = seed
+        elif self.seed is None or self.seed_used:
+            self.seed = None if self.rng else random.getrandbits(63)
+        self.seed_used = False
+
+        self.game_over = False
+        self.game_started = False
+        self.first_click = True
+        self.revealed_count = 0
+        self.mine_cells = []
+        self.exploded = None
+        self.flag_count = 0
+        self.hidden_count = self.rows * self.cols
+        self.frontier = set()
+        self.pending = set()
+        self.safe_cells = set()
+        self.moves = array("Q")
+        self.journal = None
+        self.hint_available = True
+
+        # Пока не размещаем мины - это сделаем после первого клика
+
+    def place_mines(self, safe_row, safe_col):
+        """Размещение мин после первого клика"""
+        field = self.field
+        cells = self.rows * self.cols
+
+        if self.seed is None and self.rng is None:
+            self.seed = random.getrandbits(63)
+        self.seed_used = True
+        self.game_started = True
+        self.start_time = time.time()
+        if self.journal is not None:
+            self.journal.append((UNDO_PLACE,))
+
+        # Поле без угадывания: из пула или генерируется здесь же
+        if self.no_guess:
+            layout = self.no_guess_layout(safe_row, safe_col)
+            if layout is not None:
+                self.lay_mines(layout["mines"])
+                return
+            # Не нашлось (или не успели) - обычное поле, и игра это честно показывает
+            self.no_guess = False
+
+        # Безопасная зона 3x3 вокруг первого клика
+        safe = field.index(safe_row, safe_col)
+        safe_zone = set(field.neighbours(safe))
+        safe_zone.add(safe)
+
+        # Мины выбирает генератор поля одним вызовом sample - одинаково
+        # с NumPy и без него, чтобы номер поля не зависел от окружения
+        rng = self.rng or random.Random(self.seed)
+        picks = rng.sample(range(cells - len(safe_zone)), self.mines)
+
+        # Номер среди клеток вне безопасной зоны -> индекс клетки
+        if self.use_numpy:
+            np = numpy()
+            allowed = np.ones(cells, dtype=bool)
+            allowed[list(safe_zone)] = False
+            mines = np.flatnonzero(allowed)[np.array(picks, dtype=np.intp)]
+        else:
+            candidates = [i for i in range(cells) if i not in safe_zone]
+            mines = [candidates[p] for p in picks]
+        self.lay_mines(mines)
+
+    def no_guess_layout(self, safe_row, safe_col):
+        """Расстановка мин, которую решатель проходит без угадывания (или None)"""
+        if self.pool is not None and self.topology == FLAT:
+            # Поле из пула сгенерировано не от этого номера
+            self.seed = None
+            return self.pool.take(self.rows, self.cols, self.mines, safe_row, safe_col)
+        from .noguess import generate
+        return generate(self.rows, self.cols, self.mines, safe_row, safe_col,
+                        self.rng or self.seed, self.topology, self.no_guess_budget)
+
+    def lay_mines(self, mines):
+        """Поставить мины в клетки с индексами mines и посчитать соседей"""
+        # На узком торе сдвиги NumPy посчитали бы одного соседа дважды
+        if self.use_numpy and (self.topology == FLAT or min(self.rows, self.cols) >= 3):
+            self.lay_mines_numpy(mines)
+            return
+
+        # Обновляем счетчики вокруг мин (клетки самих мин перезапишем)
+        data = self.field.data
+        table = self.field.table
+        for i in mines:
+            for j in table[i]:
+                data[j] += 1
+        for i in mines:
+            data[i] = MINE | data[i] & FLAG
+        self.mine_cells = list(mines)
+
+    def lay_mines_numpy(self, mines):
+        """То же через NumPy: сумма сдвигов поля мин"""
+        np = numpy()
+        grid = self.field.array()
+
+        chosen = np.asarray(mines, dtype=np.intp)
+        mines = np.zeros(self.rows * self.cols, dtype=np.uint8)
+        mines[chosen] = 1
+        mines = mines.reshape(self.rows, self.cols)
+        self.mine_cells = chosen.tolist()
+
+        # Сумма 8 сдвигов поля: с рамкой из нулей или по кругу на торе
+        counts = np.zeros((self.rows, self.cols), dtype=np.uint8)
+        if self.topology == TORUS:
+            for dr in (-1, 0, 1):
+                for dc in (-1, 0, 1):
+                    if dr or dc:
+                        counts += np.roll(mines, (dr, dc), axis=(0, 1))
+        else:
+            padded = np.pad(mines, 1)
+            for dr in (0, 1, 2):
+                for dc in (0, 1, 2):
+                    if dr != 1 or dc != 1:
+                        counts += padded[dr:dr + self.rows, dc:dc + self.cols]
+
+        grid[:] = np.where(mines == 1, MINE, counts) | (grid & FLAG)
+
+    def fingerprint(self):
+        """Короткий отпечаток расстановки мин (None, пока мины не размещены).
+        Совпадает у одинаковых полей, удобен как ключ кэша и для поиска повторов"""
+        if self.first_click:
+            return None
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(b"%d:%d:%d:" % (self.rows, self.cols, self.mines))
+        if self.topology != FLAT:
+            digest.update(self.topology.encode() + b":")
+        digest.update(self.field.packed(MINE))
+        return digest.hexdigest()
+
+    def reveal(self, row, col):
+        """Открыть клетку, возвращает список открытых клеток"""
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return []
+
+        data = self.field.data
+        start = row * self.cols + col
+        if data[start] & (REVEALED | FLAG):
+            return []
+        self.moves.append(start * 4 + MOVE_REVEAL)
+
+        # Первый клик - размещаем мины
+        if self.first_click:
+            self.place_mines(row, col)
+            self.first_click = False
+
+        # Открываем область через стек, каждая клетка посещается один раз
+        table = self.field.table
+        cols = self.cols
+        value, closed, revealed = MINE | COUNT_MASK, REVEALED | FLAG, REVEALED
+        opened = []
+        data[start] |= REVEALED
+        stack = [start]
+        while stack:
+            i = stack.pop()
+            opened.append(i)
+
+            # Если пустая клетка, открываем соседей
+            if not data[i] & value:
+                for j in table[i]:
+                    if not data[j] & closed:
+                        data[j] |= revealed
+                        stack.append(j)
+
+        self.revealed_count += len(opened)
+        self.hidden_count -= len(opened)
+        if data[start] & MINE:
+            self.exploded = start
+        journal = self.journal
+        if journal is not None:
+            entry = (UNDO_REVEAL, opened, self.safe_cells.intersection(opened), [])
+            journal.append(entry)
+        self.safe_cells.difference_update(opened)
+
+        # Новые числа и числа рядом с ними попадают в очередь решателя
+        frontier, pending = self.frontier, self.pending
+        for i in opened:
+            if data[i] & value:
+                frontier.add(i)
+                pending.add(i)
+                for j in table[i]:
+                    if j in frontier and j not in pending:
+                        pending.add(j)
+                        if journal is not None:
+                            entry[3].append(j)
+
+        return [divmod(i, cols) for i in opened]
+
+    def toggle_flag(self, row, col):
+        """Поставить/снять флаг, возвращает список измененных клеток"""
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return []
+        i = row * self.cols + col
+        if self.field.data[i] & REVEALED:
+            return []
+        self.moves.append(i * 4 + MOVE_FLAG)
+
+        self.field.data[i] ^= FLAG
+        if self.field.data[i] & FLAG:
+            self.flag_count += 1
+            self.hidden_count -= 1
+        else:
+            self.flag_count -= 1
+            self.hidden_count += 1
+
+        # Перепроверяем числа вокруг флага; снятый флаг мог быть опорой выводов
+        added, queued, dropped = self.requeue(i)
+        if self.journal is not None:
+            self.journal.append((UNDO_FLAG, i, added, queued, dropped))
+        return [(row, col)]
+
+    def requeue(self, i):
+        """Вернуть в очередь решателя числа вокруг клетки i (флаг на ней
+        только что поставлен или снят). Возвращает (числа, вернувшиеся
+        в границу, новые в очереди, забытые безопасные клетки)"""
+        data = self.field.data
+        table = self.field.table
+        frontier, pending = self.frontier, self.pending
+
+        # Новый флаг прежних выводов не отменяет - они следуют из меньшего
+        # числа флагов. Снятый мог быть неверным, а выводы цепляются друг
+        # за друга по всему полю - забываем все безопасные клетки
+        dropped = ()
+        if not data[i] & FLAG and self.safe_cells:
+            dropped, self.safe_cells = self.safe_cells, set()
+
+        # Числа рядом со скрытой клеткой снова на границе (решенное число могло
+        # опираться на снятый флаг или забытую безопасную клетку)
+        added, queued = [], []
+        for j in [i, *dropped]:
+            for k in table[j]:
+                if data[k] & (REVEALED | MINE) == REVEALED and data[k] & COUNT_MASK:
+                    if k not in frontier:
+                        frontier.add(k)
+                        added.append(k)
+                    if k not in pending:
+                        pending.add(k)
+                        queued.append(k)
+        return added, queued, dropped
+
+    def chord(self, row, col):
+        """Аккорд: если вокруг открытого числа столько флагов, сколько мин,
+        открыть всех остальных соседей (неверный флаг - проигрыш).
+        Возвращает список открытых клеток"""
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return []
+        data = self.field.data
+        i = row * self.cols + col
+        need = data[i] & COUNT_MASK
+        if data[i] & (REVEALED | MINE) != REVEALED or not need:
+            return []
+        around = self.field.table[i]
+        if sum(1 for j in around if data[j] & FLAG) != need:
+            return []
+        opened = []
+        for j in around:
+            if not data[j] & (REVEALED | FLAG):
+                opened += self.reveal(*divmod(j, self.cols))
+        return opened
+
+    def apply_moves(self, moves):
+        """Применить пачку ходов (действие, row, col), действия - ACTIONS.
+        Каждый ход стоит столько же, сколько отдельный вызов; пачка дает один
+        общий итог на все ходы (один ответ сервера вместо многих).
+        Ходы вне поля и ходы, которые ничего не меняют, пропускаются,
+        после конца игры - не применяются. Возвращает общий итог: измененные
+        клетки (без повторов), итог игры и счетчики (applied - сколько ходов применено)"""
+        moves = list(moves)
+        for action, row, col in moves:
+            if action not in ACTIONS:
+                raise ValueError(f"неизвестный ход: {action}")
+        handlers = {ACTION_REVEAL: self.reveal, ACTION_FLAG: self.toggle_flag, ACTION_CHORD: self.chord}
+        changed = []
+        applied = 0
+        repeats = False  # открытия не пересекаются, повторы дают только флаги и мины
+        for action, row, col in moves:
+            if self.game_over:
+                break
+            # Ход вне поля или без изменений обработчик возвращает пустым
+            done = handlers[action](row, col)
+            if not done:
+                continue
+            applied += 1
+            changed += done
+            repeats = repeats or action == ACTION_FLAG
+            if self.exploded is not None or self.check_win():
+                # Конец игры - один раз за пачку, мины открываются в том же итоге
+                self.game_over = True
+                if self.exploded is not None:
+                    changed += self.show_all_mines()
+                    repeats = True
+        return {
+            "changed": list(dict.fromkeys(changed)) if repeats else changed,
+            "result": self.result(),
+            "applied": applied,
+            "revealed": self.revealed_count,
+            "flags": self.flag_count,
+            "mines_left": self.mines - self.flag_count,
+        }
+
+    def result(self):
+        """Итог игры: PLAYING, WON или LOST"""
+        if self.exploded is not None:
+            return LOST
+        return WON if self.check_win() else PLAYING
+
+    def check_win(self):
+        """Проверка победы"""
+        # Все не-минные клетки открыты (открытая мина тоже в revealed_count)
+        non_mine_cells = self.rows * self.cols - self.mines
+        return self.exploded is None and self.revealed_count == non_mine_cells
+
+    def check_game_over(self):
+        """Проверка проигрыша"""
+        return self.exploded is not None
+
+    def show_all_mines(self):
+        """Открыть все мины, возвращает их список"""
+        data = self.field.data
+        shown = []
+        for i in self.mine_cells:
+            if not data[i] & (REVEALED | FLAG):
+                self.hidden_count -= 1
+            if not data[i] & REVEALED:
+                shown.append(i)
+            data[i] |= REVEALED
+        if self.journal is not None:
+            self.journal.append((UNDO_SHOW, shown))
+        return [divmod(i, self.cols) for i in self.mine_cells]
+
+    def mine_probabilities(self, cancel=None):
+        """Вероятности мин: словарь {(r, c): p} для скрытых клеток границы
+        и одна общая вероятность для остальных скрытых клеток (или None).
+        cancel - threading.Event: если он установлен, разбор бросается
+        между компонентами и возвращается None"""
+        data = self.field.data
+        table = self.field.table
+        hidden = self.hidden_count
+        mines = self.mines - self.flag_count
+        if self.first_click:
+            return {}, mines / hidden if hidden else None
+
+        # Ограничения от чисел границы: неизвестные соседи и сколько там мин
+        constraints = {}
+        for i in self.frontier:
+            unknown = []
+            need = data[i] & COUNT_MASK
+            for j in table[i]:
+                if data[j] & FLAG:
+                    need -= 1
+                elif not data[j] & REVEALED:
+                    unknown.append(j)
+            if unknown and 0 <= need <= len(unknown):
+                constraints[tuple(unknown)] = need
+
+        # Компоненты: клетки, связанные общими ограничениями
+        parent = {}
+
+        def root(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for cells in constraints:
+            for x in cells:
+                parent.setdefault(x, x)
+            first = root(cells[0])
+            for x in cells[1:]:
+                parent[root(x)] = first
+
+        groups = {}
+        for cells, need in constraints.items():
+            groups.setdefault(root(cells[0]), []).append((cells, need))
+
+        # Каждую компоненту переводим в канонический вид и решаем (с кэшем)
+        solved = []
+        unsolved = {}
+        for group in groups.values():
+            if cancel is not None and cancel.is_set():
+                return None
+            cells = sorted({x for group_cells, need in group for x in group_cells})
+            local = {x: n for n, x in enumerate(cells)}
+            signature = tuple(sorted((tuple(local[x] for x in group_cells), need)
+                                     for group_cells, need in group))
+            solutions = component_solutions(len(cells), signature)
+            if solutions:
+                solved.append((cells, solutions))
+            else:
+                # Слишком сложная компонента - средняя плотность ее ограничений
+                for group_cells, need in group:
+                    for x in group_cells:
+                        unsolved.setdefault(x, []).append(need / len(group_cells))
+
+        probabilities = {x: sum(values) / len(values) for x, values in unsolved.items()}
+        interior = hidden - len(parent)
+        mines -= round(sum(probabilities.values()))
+        components = [solutions for cells, solutions in solved]
+
+        if cancel is not None and cancel.is_set():
+            return None
+        work = sum(len(solutions) for solutions in components) ** 2 * max(len(components), 1)
+        result = None
+        if work <= EXACT_COMBINE_LIMIT:
+            result = combine_exact(components, mines, interior)
+        if result is None:
+            result = combine_approximate(components, mines, interior)
+        component_probabilities, interior_probability = result
+
+        for (cells, solutions), values in zip(solved, component_probabilities):
+            probabilities.update(zip(cells, values))
+        return {self.field.cell(x): p for x, p in probabilities.items()}, interior_probability
+
+    def get_hint(self):
+        """Получить подсказку: клетку с наименьшей вероятностью мины"""
+        hint = self.find_hint()
+        if hint is not None:
+            self.record(MOVE_HINT, *hint)
+        return hint
+
+    def find_hint(self, cancel=None):
+        """Клетка с наименьшей вероятностью мины (без записи в журнал)"""
+        result = self.mine_probabilities(cancel)
+        if result is None:
+            return None
+        probabilities, interior = result
+        best = min(probabilities.items(), key=lambda item: item[1], default=None)
+        if best and (interior is None or best[1] <= interior):
+            return best[0]
+        if interior is None:
+            return None
+
+        # Внутренние клетки равноценны - берем случайную, не лежащую на границе.
+        # Обычно хватает нескольких проб, поле целиком смотрим только если нет
+        data = self.field.data
+        for _ in range(100):
+            i = random.randrange(len(data))
+            if not data[i] & (REVEALED | FLAG) and self.field.cell(i) not in probabilities:
+                return self.field.cell(i)
+        inside = [i for i in positions(data.translate(HIDDEN_TABLE))
+                  if self.field.cell(i) not in probabilities]
+        if inside:
+            return self.field.cell(random.choice(inside))
+        return best[0] if best else None
+
+    def auto_flag(self):
+        """Автоматическая расстановка флагов, возвращает (новые флаги, безопасные клетки)"""
+        self.moves.append(MOVE_AUTO)
+        solver = Solver(self)
+        result = solver.solve()
+        if self.journal is not None:
+            self.journal.append((UNDO_SOLVE, solver.pending, solver.solved, solver.flagged, solver.found))
+        return result
+
+    def snapshot(self):
+        """Точка отката за O(1): счетчики игры и место в журнале изменений.
+        С первой точки каждый ход пишет в журнал только измененные клетки"""
+        if self.journal is None:
+            self.journal = []
+        return (len(self.journal), len(self.moves), self.revealed_count, self.flag_count,
+                self.hidden_count, self.exploded, self.game_over, self.game_started,
+                self.first_click, self.seed, self.seed_used)
+
+    def restore(self, token):
+        """Откатить игру к точке snapshot (точки, сделанные после нее,
+        становятся недействительными). Подсказка остается использованной,
+        время игры не откатывается. Возвращает индексы измененных клеток"""
+        journal = self.journal
+        data = self.field.data
+        changed = []
+        while len(journal) > token[0]:
+            entry = journal.pop()
+            kind = entry[0]
+            if kind == UNDO_REVEAL:
+                opened = entry[1]
+                for i in opened:
+                    data[i] &= ~REVEALED & 0xFF
+                self.frontier.difference_update(opened)
+                self.pending.difference_update(opened)
+                self.pending.difference_update(entry[3])
+                self.safe_cells.update(entry[2])
+                changed += opened
+            elif kind == UNDO_FLAG:
+                data[entry[1]] ^= FLAG
+                self.frontier.difference_update(entry[2])
+                self.pending.difference_update(entry[3])
+                self.safe_cells.update(entry[4])
+                changed.append(entry[1])
+            elif kind == UNDO_SOLVE:
+                flagged = entry[3]
+                for i in flagged:
+                    data[i] &= ~FLAG & 0xFF
+                self.pending = set(entry[1])
+                self.frontier.update(entry[2])
+                self.safe_cells.difference_update(entry[4])
+                changed += flagged
+            elif kind == UNDO_SHOW:
+                for i in entry[1]:
+                    data[i] &= ~REVEALED & 0xFF
+                changed += entry[1]
+            elif kind == UNDO_PLACE:
+                data[:] = data.translate(FLAG_ONLY_TABLE)
+                self.mine_cells = []
+        del self.moves[token[1]:]
+        (self.revealed_count, self.flag_count, self.hidden_count, self.exploded, self.game_over,
+         self.game_started, self.first_click, self.seed, self.seed_used) = token[2:]
+        return changed
+
+    def record(self, kind, row=0, col=0):
+        """Записать ход в журнал (для ходов, которые делаются не через движок)"""
+        self.moves.append((row * self.cols + col) * 4 + kind)
@@ -0,0 +1,813 @@
+"""Интерфейс сапера на tkinter"""
+import queue
+import threading
+import time
+import tkinter as tk
+from collections import deque
+from tkinter import messagebox, simpledialog
+
+from .engine import ACTION_CHORD, ACTION_FLAG, ACTION_REVEAL, MOVE_HINT, MinesweeperGame
+from .topology import FLAT, TORUS
+
+
+# Размеры поля: максимум для своей сложности и видимая часть в клетках
+MAX_BOARD_SIZE = 1000
+VIEW_CELLS = 30
+VIEW_MARGIN = 2
+
+# Как часто главный поток проверяет, готов ли фоновый анализ (мс)
+POLL_MS = 20
+
+# Биты event.state: зажаты левая и правая кнопки мыши (для аккорда двумя кнопками)
+LEFT_BUTTON_MASK = 0x100
+RIGHT_BUTTON_MASK = 0x400
+
+# Сколько последних кадров хранить для статистики времени отрисовки
+FRAME_HISTORY = 240
+
+# Точечный шрифт 5x7 для чисел на клетках
+DIGITS = {
+    1: ("..#..", ".##..", "..#..", "..#..", "..#..", "..#..", ".###."),
+    2: (".###.", "#...#", "....#", "...#.", "..#..", ".#...", "#####"),
+    3: ("####.", "....#", "....#", ".###.", "....#", "....#", "####."),
+    4: ("...#.", "..##.", ".#.#.", "#..#.", "#####", "...#.", "...#."),
+    5: ("#####", "#....", "####.", "....#", "....#", "#...#", ".###."),
+    6: (".###.", "#....", "#....", "####.", "#...#", "#...#", ".###."),
+    7: ("#####", "....#", "...#.", "..#..", ".#...", ".#...", ".#..."),
+    8: (".###.", "#...#", "#...#", ".###.", "#...#", "#...#", ".###."),
+}
+
+
+def solve_all(game, cancel):
+    """Ставить флаги и открывать доказанно безопасные клетки, пока получается.
+    Возвращает список измененных клеток"""
+    changed = []
+    while not cancel.is_set():
+        flags, safe = game.auto_flag()
+        changed += flags
+        for row, col in safe:
+            changed += game.reveal(row, col)
+        if not safe or game.check_game_over():
+            break
+    return changed
+
+
+class MinesweeperGUI:
+    def __init__(self):
+        self.root = tk.Tk()
+        self.root.title("Сапер")
+
+        # Начальные параметры
+        self.rows = 9
+        self.cols = 9
+        self.mines = 10
+
+        # Создаем игру
+        self.game = MinesweeperGame(self.rows, self.cols, self.mines)
+
+        # Тепловая карта вероятностей мин (считается только при изменении поля)
+        self.heat_map = tk.BooleanVar(value=False)
+        self.heat = None
+
+        # Фоновый анализ: имя задания -> событие отмены; готовые результаты
+        # рабочие потоки кладут в очередь, главный поток забирает их в poll_jobs
+        self.jobs = {}
+        self.results = queue.Queue()
+        self.poll_id = None
+        self.poll_ticks = 0
+
+        # Точки отката игры перед каждым ходом игрока (game.snapshot)
+        self.undo_stack = []
+
+        # Поля без угадывания из фонового пула (пул создается при включении)
+        self.no_guess = tk.BooleanVar(value=False)
+        self.pool = None
+
+        # Поле-тор: противоположные края склеены
+        self.torus = tk.BooleanVar(value=False)
+
+        # Создаем интерфейс
+        self.init_frames()
+        self.create_widgets()
+
+        # Запускаем новую игру
+        self.new_game()
+
+        # Запускаем таймер обновления
+        self.update_timer()
+
+    def create_widgets(self):
+        """Создание интерфейса"""
+        # Панель управления
+        self.control_frame = tk.Frame(self.root)
+        self.control_frame.pack(pady=5)
+
+        # Кнопка новой игры
+        self.new_game_btn = tk.Button(
+            self.control_frame,
+            text="Новая игра",
+            command=self.new_game,
+            font=("Arial", 12),
+            width=12
+        )
+        self.new_game_btn.pack(side=tk.LEFT, padx=5)
+
+        # Счетчик мин
+        self.mines_label = tk.Label(
+            self.control_frame,
+            text=f"Мин: {self.mines}",
+            font=("Arial", 12),
+            width=10
+        )
+        self.mines_label.pack(side=tk.LEFT, padx=5)
+
+        # Таймер
+        self.timer_label = tk.Label(
+            self.control_frame,
+            text="Время: 00:00",
+            font=("Arial", 12),
+            width=12
+        )
+        self.timer_label.pack(side=tk.LEFT, padx=5)
+
+        # Кнопка подсказки
+        self.hint_btn = tk.Button(
+            self.control_frame,
+            text="Подсказка (H)",
+            command=self.give_hint,
+            font=("Arial", 12),
+            width=12
+        )
+        self.hint_btn.pack(side=tk.LEFT, padx=5)
+
+        # Кнопка авто-флагов
+        self.auto_flag_btn = tk.Button(
+            self.control_frame,
+            text="Авто-флаги (F)",
+            command=self.auto_flag,
+            font=("Arial", 12),
+            width=12
+        )
+        self.auto_flag_btn.pack(side=tk.LEFT, padx=5)
+
+        # Индикатор фонового анализа
+        self.status_label = tk.Label(self.control_frame, text="", font=("Arial", 12), width=10)
+        self.status_label.pack(side=tk.LEFT, padx=5)
+
+        # Игровое поле с прокруткой для больших досок
+        self.board_frame = tk.Frame(self.root)
+        self.board_frame.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
+
+        self.canvas = tk.Canvas(
+            self.board_frame,
+            bg=self.game.colors["hidden"],
+            highlightthickness=0
+        )
+        self.x_scroll = tk.Scrollbar(self.board_frame, orient=tk.HORIZONTAL, command=self.canvas.xview)
+        self.y_scroll = tk.Scrollbar(self.board_frame, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.canvas.config(xscrollcommand=self.on_x_scroll, yscrollcommand=self.on_y_scroll)
+
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.y_scroll.grid(row=0, column=1, sticky="ns")
+        self.x_scroll.grid(row=1, column=0, sticky="ew")
+        self.board_frame.rowconfigure(0, weight=1)
+        self.board_frame.columnconfigure(0, weight=1)
+        self.resize_canvas()
+
+        # Привязка событий
+        self.canvas.bind("<Button-1>", self.left_click)
+        self.canvas.bind("<Button-3>", self.right_click)
+        self.canvas.bind("<Button-2>", self.middle_click)
+        self.canvas.bind("<Configure>", lambda e: self.invalidate(viewport=True))
+        self.canvas.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.canvas.bind("<Shift-MouseWheel>", self.on_mouse_wheel)
+        self.canvas.bind("<Button-4>", lambda e: self.canvas.yview_scroll(-1, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self.canvas.yview_scroll(1, "units"))
+        self.root.bind("<h>", lambda e: self.give_hint())
+        self.root.bind("<H>", lambda e: self.give_hint())
+        self.root.bind("<f>", lambda e: self.auto_flag())
+        self.root.bind("<F>", lambda e: self.auto_flag())
+        self.root.bind("<Control-z>", lambda e: self.undo())
+        self.root.bind("<Control-Z>", lambda e: self.undo())
+
+        # Создаем меню
+        self.create_menu()
+
+    def create_menu(self):
+        """Создание меню"""
+        menubar = tk.Menu(self.root)
+        self.root.config(menu=menubar)
+
+        # Меню "Игра"
+        game_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Игра", menu=game_menu)
+        game_menu.add_command(label="Новая игра", command=self.new_game, accelerator="F2")
+        game_menu.add_command(label="Поле по номеру...", command=self.ask_seed)
+        game_menu.add_command(label="Отменить ход", command=self.undo, accelerator="Ctrl+Z")
+        game_menu.add_separator()
+        game_menu.add_command(label="Выход", command=self.root.quit)
+
+        # Меню "Сложность" - ВАЖНО: исправлены команды!
+        difficulty_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Сложность", menu=difficulty_menu)
+
+        # Добавляем команды с правильными вызовами
+        difficulty_menu.add_command(
+            label="Новичок (9x9, 10 мин)",
+            command=self.set_beginner
+        )
+        difficulty_menu.add_command(
+            label="Средний (16x16, 40 мин)",
+            command=self.set_intermediate
+        )
+        difficulty_menu.add_command(
+            label="Эксперт (16x30, 99 мин)",
+            command=self.set_expert
+        )
+        difficulty_menu.add_command(
+            label="Своя сложность...",
+            command=self.set_custom
+        )
+
+        # Меню "Функции"
+        features_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Функции", menu=features_menu)
+        features_menu.add_command(label="Подсказка", command=self.give_hint, accelerator="H")
+        features_menu.add_command(label="Авто-флаги", command=self.auto_flag, accelerator="F")
+        features_menu.add_checkbutton(label="Тепловая карта", variable=self.heat_map,
+                                      command=lambda: self.invalidate(heat=True))
+        features_menu.add_checkbutton(label="Без угадывания", variable=self.no_guess,
+                                      command=self.new_game)
+        features_menu.add_checkbutton(label="Поле-тор", variable=self.torus,
+                                      command=self.new_game)
+
+        # Привязка горячих клавиш
+        self.root.bind("<F2>", lambda e: self.new_game())
+
+    def set_beginner(self):
+        """Установить уровень новичка"""
+        self.rows = 9
+        self.cols = 9
+        self.mines = 10
+        self.apply_difficulty()
+
+    def set_intermediate(self):
+        """Установить средний уровень"""
+        self.rows = 16
+        self.cols = 16
+        self.mines = 40
+        self.apply_difficulty()
+
+    def set_expert(self):
+        """Установить экспертный уровень"""
+        self.rows = 16
+        self.cols = 30
+        self.mines = 99
+        self.apply_difficulty()
+
+    def set_custom(self):
+        """Установить пользовательскую сложность"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Своя сложность")
+        dialog.transient(self.root)
+        dialog.grab_set()
+
+        # Поля ввода
+        tk.Label(dialog, text=f"Строки (5-{MAX_BOARD_SIZE}):").grid(row=0, column=0, padx=5, pady=5)
+        rows_entry = tk.Entry(dialog)
+        rows_entry.grid(row=0, column=1, padx=5, pady=5)
+        rows_entry.insert(0, str(self.rows))
+
+        tk.Label(dialog, text=f"Колонки (5-{MAX_BOARD_SIZE}):").grid(row=1, column=0, padx=5, pady=5)
+        cols_entry = tk.Entry(dialog)
+        cols_entry.grid(row=1, column=1, padx=5, pady=5)
+        cols_entry.insert(0, str(self.cols))
+
+        tk.Label(dialog, text="Мины:").grid(row=2, column=0, padx=5, pady=5)
+        mines_entry = tk.Entry(dialog)
+        mines_entry.grid(row=2, column=1, padx=5, pady=5)
+        mines_entry.insert(0, str(self.mines))
+
+        def apply():
+            try:
+                rows = int(rows_entry.get())
+                cols = int(cols_entry.get())
+                mines = int(mines_entry.get())
+
+                max_mines = rows * cols // 2
+
+                if (5 <= rows <= MAX_BOARD_SIZE and 5 <= cols <= MAX_BOARD_SIZE
+                        and 1 <= mines <= max_mines):
+                    self.rows = rows
+                    self.cols = cols
+                    self.mines = mines
+                    dialog.destroy()
+                    self.apply_difficulty()
+                else:
+                    messagebox.showerror("Ошибка",
+                                         f"Некорректные значения!\n"
+                                         f"Максимум мин: {max_mines}")
+            except ValueError:
+                messagebox.showerror("Ошибка", "Введите числа!")
+
+        tk.Button(dialog, text="OK", command=apply).grid(row=3, column=0, columnspan=2, pady=10)
+
+    def apply_difficulty(self):
+        """Применить выбранную сложность"""
+        # Создаем новую игру с новыми параметрами
+        self.game = MinesweeperGame(self.rows, self.cols, self.mines)
+
+        # Запускаем новую игру
+        self.new_game()
+
+        # Обновляем размеры canvas
+        self.resize_canvas()
+
+    def new_game(self, seed=None):
+        """Начать новую игру"""
+        self.cancel_jobs()
+        self.game.topology = TORUS if self.torus.get() else FLAT
+        self.game.new_game(seed)
+        self.undo_stack = []
+        self.game.no_guess = self.no_guess.get()
+        if self.game.no_guess:
+            from .noguess import INLINE_BUDGET, NO_GUESS_MAX_CELLS
+            if self.rows * self.cols > NO_GUESS_MAX_CELLS:
+                # Поиск такого поля занял бы минуты - играем обычное
+                self.game.no_guess = False
+            # Поле по номеру и тор ищутся прямо при первом клике, без пула
+            self.game.no_guess_budget = INLINE_BUDGET
+        if self.game.no_guess and seed is None and self.game.topology == FLAT:
+            if self.pool is None:
+                from .noguess import BoardPool
+                self.pool = BoardPool()
+            self.pool.want(self.rows, self.cols, self.mines)
+            self.game.pool = self.pool
+            self.root.title("Сапер - без угадывания")
+        else:
+            # Поле по номеру генерируется здесь же, чтобы номер его повторял
+            self.game.pool = None
+            self.root.title(f"Сапер - поле {self.game.seed}")
+        self.heat = None
+        self.invalidate(full=True)
+        self.hint_btn.config(state=tk.NORMAL)
+
+    def ask_seed(self):
+        """Сыграть поле с известным номером (тот же первый клик - то же поле)"""
+        seed = simpledialog.askinteger("Поле по номеру", "Номер поля:",
+                                       parent=self.root, minvalue=0)
+        if seed is not None:
+            self.new_game(seed)
+
+    def create_tiles(self):
+        """Один раз рисуем картинки всех состояний клетки"""
+        size = self.game.cell_size
+        colors = self.game.colors
+        k = size / 35  # Размеры ниже подобраны для клетки 35 пикселей
+        self.tiles = {}
+        self.tile_size = size
+
+        def tile(fill):
+            image = tk.PhotoImage(width=size, height=size)
+            image.put(fill, to=(0, 0, size, size))
+            # Линии сетки (правую и нижнюю рисует соседняя клетка)
+            image.put(colors["grid"], to=(0, 0, size, 1))
+            image.put(colors["grid"], to=(0, 0, 1, size))
+            return image
+
+        def hidden_tile():
+            image = tile(colors["hidden"])
+            # 3D эффект (выпуклая кнопка)
+            image.put("white", to=(1, 1, size, 2))
+            image.put("white", to=(1, 1, 2, size))
+            image.put("gray", to=(size - 2, 1, size, size))
+            image.put("gray", to=(1, size - 2, size, size))
+            return image
+
+        def disc(image, radius, color):
+            center = size / 2
+            for y in range(size):
+                dy = y + 0.5 - center
+                if abs(dy) < radius:
+                    dx = (radius * radius - dy * dy) ** 0.5
+                    image.put(color, to=(round(center - dx), y, round(center + dx), y + 1))
+
+        self.tiles["hidden"] = hidden_tile()
+
+        # Флаг: древко и треугольник
+        flag = hidden_tile()
+        pole_x = int(10 * k)
+        flag.put("black", to=(pole_x - 1, int(10 * k), pole_x + 1, size - int(10 * k)))
+        for y in range(int(10 * k), int(20 * k) + 1):
+            width = int(15 * k * (1 - abs(y - 15 * k) / (5 * k)))
+            if width > 0:
+                flag.put(colors["flag"], to=(pole_x, y, pole_x + width, y + 1))
+        self.tiles["flag"] = flag
+
+        # Мины с черной обводкой
+        for state in ("mine", "exploded"):
+            image = tile(colors["revealed"])
+            disc(image, size / 2 - 5, "black")
+            disc(image, size / 2 - 6, colors[state])
+            self.tiles[state] = image
+
+        # Числа рисуем точечным шрифтом
+        scale = max(1, size // 14)
+        left = (size - 5 * scale) // 2
+        top = (size - 7 * scale) // 2
+        self.tiles[0] = tile(colors["revealed"])
+        for number, rows in DIGITS.items():
+            image = tile(colors["revealed"])
+            color = colors.get(str(number), "black")
+            for y, line in enumerate(rows):
+                for x, pixel in enumerate(line):
+                    if pixel == "#":
+                        image.put(color, to=(left + x * scale, top + y * scale,
+                                             left + (x + 1) * scale, top + (y + 1) * scale))
+            self.tiles[number] = image
+
+    def resize_canvas(self):
+        """Размер окна поля: вся доска, но не больше VIEW_CELLS клеток"""
+        size = self.game.cell_size
+        self.canvas.config(
+            width=min(self.game.cols, VIEW_CELLS) * size,
+            height=min(self.game.rows, VIEW_CELLS) * size,
+            scrollregion=(0, 0, self.game.cols * size, self.game.rows * size),
+            xscrollincrement=size,
+            yscrollincrement=size
+        )
+        self.canvas.xview_moveto(0)
+        self.canvas.yview_moveto(0)
+
+    def on_x_scroll(self, first, last):
+        """Прокрутка по горизонтали"""
+        self.x_scroll.set(first, last)
+        self.invalidate(viewport=True)
+
+    def on_y_scroll(self, first, last):
+        """Прокрутка по вертикали"""
+        self.y_scroll.set(first, last)
+        self.invalidate(viewport=True)
+
+    def on_mouse_wheel(self, event):
+        """Прокрутка колесом мыши (с Shift - по горизонтали)"""
+        step = -1 if event.delta > 0 else 1
+        if event.state & 0x0001:
+            self.canvas.xview_scroll(step, "units")
+        else:
+            self.canvas.yview_scroll(step, "units")
+
+    def event_cell(self, event):
+        """Клетка под курсором с учетом прокрутки"""
+        col = int(self.canvas.canvasx(event.x)) // self.game.cell_size
+        row = int(self.canvas.canvasy(event.y)) // self.game.cell_size
+        return row, col
+
+    def init_frames(self):
+        """Состояние планировщика отрисовки"""
+        self.frame_id = None
+        self.dirty_full = False
+        self.dirty_viewport = False
+        self.dirty_heat = False
+        self.dirty_cells = set()
+        self.frame_times = deque(maxlen=FRAME_HISTORY)
+        self.label_texts = {}
+
+    def invalidate(self, cells=(), full=False, viewport=False, heat=False):
+        """Запросить перерисовку. Все запросы до ближайшего простоя Tk
+        рисуются одним кадром, сколько бы их ни было"""
+        self.dirty_cells.update(cells)
+        self.dirty_full |= full
+        self.dirty_viewport |= viewport
+        self.dirty_heat |= heat
+        if self.frame_id is None:
+            self.frame_id = self.root.after_idle(self.paint)
+
+    def paint(self):
+        """Один кадр: нарисовать все накопленные изменения"""
+        self.frame_id = None
+        started = time.perf_counter()
+        if self.dirty_full:
+            self.draw_board()
+        else:
+            # Сначала клетки, потом карта - она смотрит на состояния клеток
+            self.update_cells(self.dirty_cells)
+            if self.dirty_viewport:
+                self.update_viewport()
+            elif self.dirty_heat:
+                self.draw_heat_map()
+        self.dirty_full = self.dirty_viewport = self.dirty_heat = False
+        self.dirty_cells = set()
+        self.update_mines_label()
+        self.frame_times.append(time.perf_counter() - started)
+
+    def flush(self):
+        """Нарисовать накопленное сразу (например, перед модальным окном)"""
+        if self.frame_id is not None:
+            self.root.after_cancel(self.frame_id)
+            self.paint()
+
+    def frame_stats(self):
+        """Время отрисовки последних кадров, мс"""
+        times = sorted(self.frame_times)
+        if not times:
+            return {"frames": 0}
+        return {
+            "frames": len(times),
+            "p50_ms": round(times[len(times) // 2] * 1000, 3),
+            "p99_ms": round(times[min(len(times) - 1, len(times) * 99 // 100)] * 1000, 3),
+            "max_ms": round(times[-1] * 1000, 3),
+        }
+
+    def set_text(self, label, text):
+        """Поменять текст надписи, только если он другой"""
+        if self.label_texts.get(label) != text:
+            self.label_texts[label] = text
+            label.config(text=text)
+
+    def draw_board(self):
+        """Полная перерисовка игрового поля (новая игра или смена сложности)"""
+        if getattr(self, "tile_size", None) != self.game.cell_size:
+            self.create_tiles()
+
+        self.canvas.delete("all")
+        self.cell_items = {}
+        self.cell_states = {}
+        self.free_items = []
+        self.update_viewport()
+
+    def update_viewport(self):
+        """Держим картинки только для видимых клеток (с небольшим запасом)"""
+        if not hasattr(self, "cell_items"):
+            return
+
+        size = self.game.cell_size
+        width = max(self.canvas.winfo_width(), int(self.canvas["width"]))
+        height = max(self.canvas.winfo_height(), int(self.canvas["height"]))
+        left = int(self.canvas.canvasx(0)) // size - VIEW_MARGIN
+        top = int(self.canvas.canvasy(0)) // size - VIEW_MARGIN
+        rows = range(max(top, 0), min(top + height // size + 2 * VIEW_MARGIN + 2, self.game.rows))
+        cols = range(max(left, 0), min(left + width // size + 2 * VIEW_MARGIN + 2, self.game.cols))
+
+        # Ушедшие из окна клетки отдают свои картинки в запас
+        for cell in list(self.cell_items):
+            r, c = cell
+            if r not in rows or c not in cols:
+                item = self.cell_items.pop(cell)
+                del self.cell_states[cell]
+                self.canvas.itemconfig(item, state=tk.HIDDEN)
+                self.free_items.append(item)
+
+        # Появившиеся клетки берут картинку из запаса или создают новую
+        for r in rows:
+            for c in cols:
+                if (r, c) in self.cell_items:
+                    continue
+                state = self.cell_state(r, c)
+                self.cell_states[(r, c)] = state
+                if self.free_items:
+                    item = self.free_items.pop()
+                    self.canvas.coords(item, c * size, r * size)
+                    self.canvas.itemconfig(item, image=self.tiles[state], state=tk.NORMAL)
+                else:
+                    item = self.canvas.create_image(
+                        c * size, r * size, anchor=tk.NW, image=self.tiles[state]
+                    )
+                    self.canvas.tag_lower(item)
+                self.cell_items[(r, c)] = item
+
+        self.draw_heat_map()
+
+    def update_cells(self, cells):
+        """Перерисовать только изменившиеся клетки (невидимые пропускаем)"""
+        for cell in cells:
+            if cell not in self.cell_items:
+                continue
+            state = self.cell_state(*cell)
+            if self.cell_states[cell] != state:
+                self.cell_states[cell] = state
+                self.canvas.itemconfig(self.cell_items[cell], image=self.tiles[state])
+
+    def cell_state(self, r, c):
+        """Что сейчас должно быть нарисовано в клетке"""
+        field = self.game.field
+        if field.is_revealed(r, c):
+            if field.is_mine(r, c):
+                return "exploded" if self.game.game_over else "mine"
+            return field.value(r, c)
+        if field.is_flagged(r, c):
+            return "flag"
+        return "hidden"
+
+    def left_click(self, event):
+        """Обработка левого клика (при зажатой правой кнопке - аккорд)"""
+        self.play(event, ACTION_CHORD if event.state & RIGHT_BUTTON_MASK else ACTION_REVEAL)
+
+    def right_click(self, event):
+        """Обработка правого клика (при зажатой левой кнопке - аккорд)"""
+        self.play(event, ACTION_CHORD if event.state & LEFT_BUTTON_MASK else ACTION_FLAG)
+
+    def middle_click(self, event):
+        """Средняя кнопка - аккорд: открыть соседей числа, если флаги расставлены"""
+        self.play(event, ACTION_CHORD)
+
+    def play(self, event, action):
+        """Сделать ход по клетке под мышью (один ход - одна точка отката)"""
+        if self.game.game_over:
+            return
+
+        row, col = self.event_cell(event)
+
+        if 0 <= row < self.game.rows and 0 <= col < self.game.cols:
+            token = self.game.snapshot()
+            delta = self.game.apply_moves([(action, row, col)])
+            self.finish_move(delta["changed"], token)
+
+    def update_mines_label(self):
+        """Счетчик мин: сколько осталось без флагов"""
+        self.set_text(self.mines_label, f"Мин: {self.game.mines - self.game.flag_count}")
+
+    def finish_move(self, changed, token=None):
+        """Проверка состояния игры и перерисовка измененных клеток.
+        token - точка отката до хода (для отмены хода)"""
+        if changed:
+            self.cancel_jobs()
+            if token is not None:
+                self.undo_stack.append(token)
+        self.heat = None
+        if self.game.check_game_over():
+            if not self.game.game_over:
+                # Ход не через apply_moves (авто-флаги) - мины открываем здесь
+                self.game.game_over = True
+                changed = changed + self.show_all_mines()
+            self.invalidate(changed, heat=True)
+            self.flush()
+            messagebox.showinfo("Игра окончена", "Вы наступили на мину!")
+        elif self.game.check_win():
+            self.game.game_over = True
+            self.invalidate(changed, heat=True)
+            self.flush()
+            elapsed = int(time.time() - self.game.start_time)
+            messagebox.showinfo("Победа!", f"Поздравляем! Вы выиграли!\nВремя: {elapsed} сек")
+        else:
+            self.invalidate(changed, heat=True)
+
+    def draw_heat_map(self):
+        """Полупрозрачная заливка скрытых клеток по вероятности мины"""
+        self.canvas.delete("heat")
+        if not self.heat_map.get() or not self.game.game_started or self.game.game_over:
+            return
+
+        if self.heat is None:
+            # Вероятности считаются в фоне, карта дорисуется, когда они будут готовы
+            self.start_job("heat", lambda game, cancel: game.mine_probabilities(cancel),
+                           self.heat_ready)
+            return
+        probabilities, interior = self.heat
+
+        size = self.game.cell_size
+        for (r, c), state in self.cell_states.items():
+            if state != "hidden":
+                continue
+            p = min(max(probabilities.get((r, c), interior), 0.0), 1.0)
+            # От зеленого (безопасно) к красному (точно мина)
+            color = f"#{int(255 * p):02x}{int(255 * (1 - p)):02x}00"
+            self.canvas.create_rectangle(
+                c * size + 4, r * size + 4, (c + 1) * size - 4, (r + 1) * size - 4,
+                fill=color, outline="", stipple="gray50", tags="heat"
+            )
+        self.canvas.tag_raise("hint")
+
+    def heat_ready(self, game, heat):
+        self.heat = heat
+        self.invalidate(heat=True)
+
+    def start_job(self, name, work, done):
+        """Запустить work(копия игры, событие отмены) в фоновом потоке.
+        Результат передается в done(копия игры, результат) в главном потоке,
+        если до этого поле не изменилось"""
+        if name in self.jobs:
+            return
+        cancel = threading.Event()
+        self.jobs[name] = cancel
+        game = self.game.copy()
+
+        def run():
+            try:
+                result = work(game, cancel)
+            except Exception as error:
+                result = error
+            self.results.put((name, cancel, done, game, result))
+
+        threading.Thread(target=run, daemon=True).start()
+        if self.poll_id is None:
+            self.poll_id = self.root.after(POLL_MS, self.poll_jobs)
+
+    def cancel_jobs(self):
+        """Поле изменилось - результаты запущенного анализа больше не нужны"""
+        for cancel in self.jobs.values():
+            cancel.set()
+        self.jobs.clear()
+        self.status_label.config(text="")
+
+    def poll_jobs(self):
+        """Забрать готовые результаты фонового анализа (вызывается по таймеру)"""
+        self.poll_id = None
+        while True:
+            try:
+                name, cancel, done, game, result = self.results.get_nowait()
+            except queue.Empty:
+                break
+            # Устаревший результат (задание отменено или перезапущено) выбрасываем
+            if self.jobs.get(name) is cancel:
+                del self.jobs[name]
+                if isinstance(result, Exception):
+                    messagebox.showerror("Ошибка анализа", str(result))
+                else:
+                    done(game, result)
+
+        if self.jobs:
+            self.poll_ticks += 1
+            self.status_label.config(text="Думаю" + "." * (self.poll_ticks // 10 % 4))
+            self.poll_id = self.root.after(POLL_MS, self.poll_jobs)
+        else:
+            self.status_label.config(text="")
+
+    def show_all_mines(self):
+        """Показать все мины после проигрыша, возвращает список мин"""
+        return self.game.show_all_mines()
+
+    def give_hint(self):
+        """Дать подсказку"""
+        if not self.game.game_started or self.game.game_over or not self.game.hint_available:
+            return
+        self.start_job("hint", lambda game, cancel: game.find_hint(cancel), self.show_hint)
+
+    def show_hint(self, game, hint):
+        """Подсветить клетку подсказки"""
+        if hint:
+            row, col = hint
+            # Подсказку искала копия игры - в журнал пишем ход сюда
+            self.game.record(MOVE_HINT, row, col)
+            self.game.hint_available = False
+            self.hint_btn.config(state=tk.DISABLED)
+
+            # Подсвечиваем клетку
+            x1 = col * self.game.cell_size
+            y1 = row * self.game.cell_size
+            x2 = x1 + self.game.cell_size
+            y2 = y1 + self.game.cell_size
+
+            self.canvas.create_rectangle(x1, y1, x2, y2, outline="yellow", width=3, tags="hint")
+
+            # Снимаем подсветку через 2 секунды
+            self.root.after(2000, lambda: self.canvas.delete("hint"))
+
+    def auto_flag(self):
+        """Автоматическая расстановка флагов"""
+        if not self.game.game_started or self.game.game_over:
+            return
+        # Точка отката ставится до копирования - журнал достанется и копии
+        token = self.game.snapshot()
+        self.start_job("auto_flag", solve_all,
+                       lambda game, changed: self.auto_flag_ready(game, changed, token))
+
+    def auto_flag_ready(self, game, changed, token=None):
+        """Решатель закончил: его копия игры и есть новое состояние поля"""
+        # Поле, пока решатель работал, не менялось (ход отменил бы задание),
+        # но подсказка могла прийти - переносим ее с живой игры
+        if token is not None:
+            game.moves.extend(self.game.moves[token[1]:])
+        game.hint_available = self.game.hint_available
+        self.game = game
+        self.finish_move(changed, token)
+
+    def undo(self):
+        """Отменить последний ход (Ctrl+Z), в том числе проигрышный"""
+        if not self.undo_stack:
+            return
+        self.cancel_jobs()
+        changed = self.game.restore(self.undo_stack.pop())
+        self.heat = None
+        self.invalidate([divmod(i, self.game.cols) for i in changed], heat=True)
+
+    def update_timer(self):
+        """Обновление таймера (надпись меняется, только когда сменилась секунда)"""
+        if not self.game.game_started:
+            self.set_text(self.timer_label, "Время: 00:00")
+        elif not self.game.game_over:
+            elapsed = int(time.time() - self.game.start_time)
+            minutes = elapsed // 60
+            seconds = elapsed % 60
+            self.set_text(self.timer_label, f"Время: {minutes:02d}:{seconds:02d}")
+
+        # Проверяем чаще раза в секунду, чтобы секунды не проскакивали
+        self.root.after(250, self.update_timer)
+
+    def run(self):
+        """Запуск игры"""
+        try:
+            self.root.mainloop()
+        finally:
+            if self.pool is not None:
+                self.pool.close()
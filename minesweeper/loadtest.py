@@ -0,0 +1,236 @@
+"""Нагрузочный клиент для сервера игр (server.py).
+
+Много игр случайного бота идут одновременно по нескольким соединениям;
+для каждого числа игр печатается строка JSON: запросов в секунду и
+задержки ответа (p50/p99). Работает только с сервером на этой же машине
+(127.0.0.1 или Unix-сокет), с --spawn запускает сервер сам. С --batch N
+бот присылает по N ходов одним запросом moves.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+# Клиент нагружает только локальный сервер
+LOCAL_HOSTS = {"127.0.0.1", "localhost", "::1"}
+
+# Доли ходов бота: флаг и подсказка, остальное - открыть клетку
+FLAG_SHARE = 0.08
+HINT_SHARE = 0.02
+
+
+class Connection:
+    """Соединение с сервером: запросы уходят сразу, ответы сопоставляются по id"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.waiting = {}  # id -> future ответа
+        self.next_id = 0
+        self.task = asyncio.create_task(self.read())
+
+    async def read(self):
+        async for line in self.reader:
+            response = json.loads(line)
+            future = self.waiting.pop(response["id"], None)
+            if future is not None and not future.done():
+                future.set_result(response)
+        for future in self.waiting.values():
+            future.set_exception(ConnectionError("сервер закрыл соединение"))
+
+    def request(self, **request):
+        """Отправить запрос, вернуть future ответа"""
+        self.next_id += 1
+        request["id"] = self.next_id
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[self.next_id] = future
+        self.writer.write((json.dumps(request, separators=(",", ":")) + "\n").encode())
+        return future
+
+    async def close(self):
+        self.writer.close()
+        self.task.cancel()
+
+
+async def connect(host, port, unix):
+    if unix:
+        reader, writer = await asyncio.open_unix_connection(unix, limit=1 << 20)
+    else:
+        reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+    return Connection(reader, writer)
+
+
+class Stats:
+    """Задержки и счетчики одного прогона"""
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.games = 0
+        self.moves = 0  # примененных ходов (ответ applied)
+
+    async def call(self, connection, **request):
+        started = time.perf_counter()
+        response = await connection.request(**request)
+        self.latencies.append(time.perf_counter() - started)
+        if "error" in response:
+            self.errors += 1
+        self.moves += response.get("applied", 0)
+        return response
+
+
+def hidden_cells(view, cells, count, rng):
+    """До count разных случайных скрытых клеток (флаги бот не открывает)"""
+    chosen = set()
+    for _ in range(20 * count):
+        i = rng.randrange(cells)
+        if view[i] == ord("."):
+            chosen.add(i)
+            if len(chosen) == count:
+                return list(chosen)
+    if not chosen:
+        i = view.find(b".")
+        if i >= 0:
+            chosen.add(i)
+    return list(chosen)
+
+
+async def play(connection, stats, rows, cols, mines, rng, deadline, batch=1):
+    """Одна игровая сессия: партии случайного бота до истечения времени
+    (batch > 1 - ходы пачками через moves)"""
+    cells = rows * cols
+    while time.perf_counter() < deadline:
+        response = await stats.call(connection, op="new", rows=rows, cols=cols, mines=mines,
+                                    seed=rng.getrandbits(63))
+        session = response["session"]
+        view = bytearray(b"." * cells)
+        row, col = rows // 2, cols // 2
+        status = "playing"
+        first = True
+        targets = [row * cols + col]
+        while status == "playing" and time.perf_counter() < deadline:
+            roll = rng.random()
+            if roll < HINT_SHARE and not first:
+                await stats.call(connection, op="hint", session=session)
+                continue
+            if batch > 1:
+                # Первый ход пачки - по прежней клетке, остальные - флаги или открытия
+                moves = [["flag" if not first and rng.random() < FLAG_SHARE else "reveal",
+                          *divmod(i, cols)] for i in targets]
+                response = await stats.call(connection, op="moves", session=session, moves=moves)
+            else:
+                op = "flag" if not first and roll < HINT_SHARE + FLAG_SHARE else "reveal"
+                row, col = divmod(targets[0], cols)
+                response = await stats.call(connection, op=op, session=session, row=row, col=col)
+            first = False
+            if "error" in response:
+                break
+            for i, symbol in zip(response["cells"], response["view"]):
+                view[i] = ord(symbol)
+            status = response["status"]
+
+            # Следующие клетки - случайные скрытые
+            targets = hidden_cells(view, cells, batch, rng)
+            if not targets:
+                break
+        await stats.call(connection, op="close", session=session)
+        stats.games += 1
+
+
+async def run_level(host, port, unix, sessions, connections, duration, rows, cols, mines, seed, batch=1):
+    """Прогон с заданным числом одновременных игр"""
+    pool = [await connect(host, port, unix) for _ in range(min(connections, sessions))]
+    stats = Stats()
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(
+        play(pool[n % len(pool)], stats, rows, cols, mines, random.Random(rng.getrandbits(63)), deadline, batch)
+        for n in range(sessions)))
+    wall = time.perf_counter() - started
+    server = await pool[0].request(op="stats")
+    for connection in pool:
+        await connection.close()
+
+    latencies = sorted(stats.latencies)
+    count = len(latencies)
+    return {
+        "sessions": sessions,
+        "connections": len(pool),
+        "requests": count,
+        "requests_per_sec": round(count / wall) if wall else 0,
+        "moves_per_sec": round(stats.moves / wall) if wall else 0,
+        "p50_ms": round(latencies[count // 2] * 1000, 3) if count else None,
+        "p99_ms": round(latencies[min(count - 1, int(count * 0.99))] * 1000, 3) if count else None,
+        "errors": stats.errors,
+        "games": stats.games,
+        "server_requests_per_batch": server.get("requests_per_batch"),
+    }
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def spawn_server(port, unix):
+    """Запустить сервер отдельным процессом и дождаться, пока он начнет слушать"""
+    command = [sys.executable, "-m", "minesweeper", "serve"]
+    command += ["--unix", unix] if unix else ["--port", str(port)]
+    process = subprocess.Popen(command, stderr=subprocess.PIPE)
+    process.stderr.readline()  # "Сервер слушает ..."
+    return process
+
+
+async def run(args):
+    results = []
+    for sessions in args.sessions:
+        result = await run_level(args.host, args.port, args.unix, sessions, args.connections,
+                                 args.duration, args.rows, args.cols, args.mines, args.seed, args.batch)
+        print(json.dumps(result), flush=True)
+        results.append(result)
+    return results
+
+
+def main(argv):
+    """python -m minesweeper loadtest ... - нагрузка на локальный сервер игр"""
+    parser = argparse.ArgumentParser(prog="minesweeper loadtest",
+                                     description="Нагрузочный клиент для сервера игр")
+    parser.add_argument("--host", default="127.0.0.1", help="только локальный адрес")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="путь Unix-сокета сервера вместо TCP")
+    parser.add_argument("--spawn", action="store_true", help="запустить сервер самому")
+    parser.add_argument("--sessions", default="10,100,1000",
+                        help="числа одновременных игр через запятую")
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0, help="секунд на каждое число игр")
+    parser.add_argument("--rows", type=int, default=16)
+    parser.add_argument("--cols", type=int, default=30)
+    parser.add_argument("--mines", type=int, default=99)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch", type=int, default=1, help="ходов в одном запросе (больше 1 - op moves)")
+    args = parser.parse_args(argv)
+    if args.host not in LOCAL_HOSTS:
+        parser.error("нагружать можно только локальный сервер (127.0.0.1, localhost, ::1)")
+    args.sessions = [int(n) for n in args.sessions.split(",")]
+
+    server = None
+    if args.spawn:
+        if args.unix is None and args.port == parser.get_default("port"):
+            args.port = free_port()
+        server = spawn_server(args.port, args.unix)
+    try:
+        asyncio.run(run(args))
+    finally:
+        if server is not None:
+            server.send_signal(signal.SIGINT)
+            server.wait()
+            if args.unix and os.path.exists(args.unix):
+                os.unlink(args.unix)
@@ -0,0 +1,277 @@
+"""Поля без угадывания: генерация с проверкой решателем и фоновый пул готовых полей"""
+import random
+import threading
+import time
+from collections import deque
+
+from .board import COUNT_MASK, MINE, positions
+from .engine import MinesweeperGame
+from .topology import FLAT
+
+# Сколько случайных расстановок пробуем, прежде чем сдаться
+# (на слишком плотных полях решаемых без угадывания почти нет)
+MAX_ATTEMPTS = 1000
+
+# Сколько готовых полей проверяем решателем при клике вне их первого открытия
+MAX_CHECKS = 8
+
+# Сколько секунд пул ищет поле прямо при клике, если в очереди подходящего нет
+# (дальше - обычное поле, чтобы окно не зависало)
+INLINE_BUDGET = 0.5
+
+# Поля больше этого интерфейс играет обычными: одна проверка решателем
+# на них идет секунды, а попыток бывают сотни
+NO_GUESS_MAX_CELLS = 2500
+
+# Таблица для bytes.translate: 1 для пустой клетки (не мина, 0 мин вокруг)
+ZERO_TABLE = bytes(int(not b & (MINE | COUNT_MASK)) for b in range(256))
+
+
+def solvable(game, row, col, deadline=None):
+    """Проходит ли решатель поле от клика (row, col) без угадывания.
+    Возвращает открытые первым кликом клетки или None (и после deadline)"""
+    opened = game.reveal(row, col)
+    while not game.check_win():
+        if deadline is not None and time.perf_counter() > deadline:
+            return None
+        if not game.safe_cells:
+            game.auto_flag()
+        if not game.safe_cells:
+            return None
+        for i in list(game.safe_cells):
+            game.reveal(*game.field.cell(i))
+    return opened
+
+
+def generate(rows, cols, mines, row, col, seed=None, topology=FLAT, budget=None):
+    """Найти расстановку мин без угадывания для первого клика (row, col).
+    seed - номер или random.Random, topology - форма поля, budget - предел
+    поиска в секундах. Возвращает словарь с минами и пустыми клетками
+    первого открытия (клик в любую из них дает то же поле) или None"""
+    rng = seed if isinstance(seed, random.Random) else random.Random(seed)
+    started = time.perf_counter()
+    deadline = None if budget is None else started + budget
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        game = MinesweeperGame(rows, cols, mines, rng=rng, topology=topology)
+        game.new_game()
+        opened = solvable(game, row, col, deadline)
+        if opened is None:
+            if deadline is not None and time.perf_counter() > deadline:
+                return None
+            continue
+        data = game.field.data
+        return {
+            "seed": None if isinstance(seed, random.Random) else seed,
+            "row": row,
+            "col": col,
+            "mines": game.mine_cells,
+            "opening": {r * cols + c for r, c in opened
+                        if not data[r * cols + c] & (MINE | COUNT_MASK)},
+            "zeros": set(positions(data.translate(ZERO_TABLE))),
+            "attempts": attempt,
+            "time": time.perf_counter() - started,
+        }
+    return None
+
+
+def solvable_layout(rows, cols, mines, layout, row, col):
+    """Проходит ли решатель готовую расстановку от другого первого клика"""
+    game = MinesweeperGame(rows, cols, mines)
+    game.new_game()
+    game.lay_mines(layout["mines"])
+    game.first_click = False
+    game.game_started = True
+    return solvable(game, row, col) is not None
+
+
+def generate_task(task):
+    """Сгенерировать одно поле в процессе пула"""
+    return generate(*task)
+
+
+def flip_layout(layout, rows, cols, flip_rows, flip_cols):
+    """Отразить расстановку по вертикали и/или горизонтали"""
+    mines = []
+    for i in layout["mines"]:
+        r, c = divmod(i, cols)
+        if flip_rows:
+            r = rows - 1 - r
+        if flip_cols:
+            c = cols - 1 - c
+        mines.append(r * cols + c)
+    return dict(layout, mines=mines, flip=(flip_rows, flip_cols))
+
+
+class BoardPool:
+    """Очереди готовых полей без угадывания для каждой сложности,
+    пополняются в фоновых процессах.
+
+    Поле подходит к первому клику, если клик попадает в пустую область
+    его первого открытия (с учетом отражений поля) - тогда открытие и
+    дальнейшее решение будут теми же, что при проверке"""
+
+    def __init__(self, depth=8, workers=1):
+        self.depth = depth
+        self.workers = workers
+        self.executor = None
+        # RLock: колбэк готового поля может вызваться прямо внутри refill
+        self.lock = threading.RLock()
+        self.queues = {}  # (rows, cols, mines) -> готовые поля
+        self.in_flight = {}  # (rows, cols, mines) -> сколько полей генерируется
+        self.starts = {}  # (rows, cols, mines) -> первые клики заказанных полей
+        self.impossible = set()  # сложности, для которых поле не нашлось
+
+        # Метрики
+        self.hits = 0
+        self.misses = 0
+        self.timeouts = 0
+        self.generated = 0
+        self.attempts = 0
+        self.generation_time = 0.0
+        self.wait_time = 0.0
+
+    def want(self, rows, cols, mines):
+        """Начать заполнять очередь для этой сложности"""
+        with self.lock:
+            self.refill((rows, cols, mines))
+
+    def refill(self, key):
+        """Дозаказать поля до depth (вызывается под self.lock)"""
+        if key in self.impossible:
+            return
+        queue = self.queues.setdefault(key, deque())
+        if self.executor is None:
+            # Пул процессов нужен только когда включены поля без угадывания;
+            # spawn, а не fork - процесс с Tk форкать небезопасно
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            self.executor = ProcessPoolExecutor(
+                self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+        rows, cols, mines = key
+        while len(queue) + self.in_flight.get(key, 0) < self.depth:
+            row, col = self.uncovered_cell(key)
+            task = (rows, cols, mines, row, col, random.getrandbits(63))
+            self.starts.setdefault(key, []).append(row * cols + col)
+            future = self.executor.submit(generate_task, task)
+            future.add_done_callback(
+                lambda future, key=key, start=row * cols + col: self.store(key, future, start))
+            self.in_flight[key] = self.in_flight.get(key, 0) + 1
+
+    def uncovered_cell(self, key):
+        """Клетка первого клика для нового поля: по возможности такая, которую
+        не покрывают ни готовые поля очереди, ни уже заказанные"""
+        rows, cols, mines = key
+        covered = set(self.starts.get(key, ()))
+        for layout in self.queues[key]:
+            covered |= layout["opening"]
+        for _ in range(50):
+            row, col = random.randrange(rows), random.randrange(cols)
+            flips = {(r, c) for r in (row, rows - 1 - row) for c in (col, cols - 1 - col)}
+            if not any(r * cols + c in covered for r, c in flips):
+                break
+        return row, col
+
+    def store(self, key, future, start):
+        """Положить готовое поле в очередь (вызывается из потока пула)"""
+        layout = None
+        if not future.cancelled() and future.exception() is None:
+            layout = future.result()
+        with self.lock:
+            self.in_flight[key] -= 1
+            self.starts[key].remove(start)
+            if future.cancelled():
+                return
+            if layout is None:
+                self.impossible.add(key)
+                return
+            self.generated += 1
+            self.attempts += layout["attempts"]
+            self.generation_time += layout["time"]
+            self.queues[key].append(layout)
+            self.refill(key)
+
+    def take(self, rows, cols, mines, row, col):
+        """Расстановка для первого клика (row, col): из очереди, а если
+        подходящей нет - генерируется сразу, не дольше INLINE_BUDGET.
+        None, если найти не удалось"""
+        key = (rows, cols, mines)
+        with self.lock:
+            if key in self.impossible:
+                return None
+            queue = self.queues.get(key, ())
+            flips = [(flip_rows, flip_cols)
+                     for flip_rows in (False, True) for flip_cols in (False, True)]
+
+            def cell(flip_rows, flip_cols):
+                r = rows - 1 - row if flip_rows else row
+                c = cols - 1 - col if flip_cols else col
+                return r * cols + c
+
+            # Клик в первое открытие готового поля - то же поле, проверять не нужно
+            found = next(((layout, flip) for layout in queue for flip in flips
+                          if cell(*flip) in layout["opening"]), None)
+
+            # Клик в другую пустую клетку - мин рядом нет, но решатель нужно
+            # прогнать заново от этой клетки
+            if found is None:
+                checks = 0
+                for layout, flip in ((layout, flip) for layout in queue for flip in flips
+                                     if cell(*flip) in layout["zeros"]):
+                    flipped = flip_layout(layout, rows, cols, *flip)
+                    if solvable_layout(rows, cols, mines, flipped, row, col):
+                        found = layout, flip
+                        break
+                    checks += 1
+                    if checks == MAX_CHECKS:
+                        break
+
+            if found is not None:
+                layout, flip = found
+                queue.remove(layout)
+                self.hits += 1
+                self.refill(key)
+                return flip_layout(layout, rows, cols, *flip)
+            self.misses += 1
+            self.refill(key)
+
+        started = time.perf_counter()
+        layout = generate(rows, cols, mines, row, col, random.getrandbits(63), budget=INLINE_BUDGET)
+        with self.lock:
+            self.wait_time += time.perf_counter() - started
+            if layout is None:
+                # Не успели - это еще не значит, что таких полей нет: очередь
+                # продолжает пополняться в фоне без предела по времени
+                self.timeouts += 1
+            else:
+                self.generated += 1
+                self.attempts += layout["attempts"]
+                self.generation_time += layout["time"]
+        return layout
+
+    def metrics(self):
+        """Попадания в очередь, глубина очередей и цена генерации"""
+        with self.lock:
+            taken = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "timeouts": self.timeouts,
+                "hit_rate": round(self.hits / taken, 3) if taken else None,
+                "queued": {f"{r}x{c}/{m}": len(queue)
+                           for (r, c, m), queue in self.queues.items()},
+                "in_flight": sum(self.in_flight.values()),
+                "generated": self.generated,
+                "attempts_per_board": round(self.attempts / self.generated, 1)
+                if self.generated else None,
+                "generation_ms": round(self.generation_time / self.generated * 1000, 1)
+                if self.generated else None,
+                "miss_wait_ms": round(self.wait_time / self.misses * 1000, 1)
+                if self.misses else None,
+            }
+
+    def close(self):
+        """Остановить фоновую генерацию"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
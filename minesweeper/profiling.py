@@ -0,0 +1,150 @@
+"""Замеры горячих мест: число вызовов, время и сколько клеток затронуто.
+
+Пока замеры не включены (enable), методы не обернуты и ничего не стоят.
+"""
+import atexit
+import functools
+import json
+import time
+from array import array
+
+from .engine import MinesweeperGame
+
+# Что замеряем в движке: метод -> сколько клеток затронул вызов (или None)
+ENGINE_METHODS = {
+    "place_mines": lambda game, args, result: game.mines,
+    "reveal": lambda game, args, result: len(result),
+    "toggle_flag": lambda game, args, result: len(result),
+    "chord": lambda game, args, result: len(result),
+    "apply_moves": lambda game, args, result: len(result["changed"]),
+    "auto_flag": lambda game, args, result: len(result[0]) + len(result[1]),
+    "get_hint": None,
+    "mine_probabilities": lambda game, args, result: len(result[0]),
+    "check_win": None,
+    "check_game_over": None,
+}
+
+# Что замеряем в окне
+GUI_METHODS = {
+    "paint": None,
+    "draw_board": None,
+    "update_viewport": None,
+    "update_cells": lambda gui, args, result: len(args[0]),
+    "draw_heat_map": None,
+}
+
+# Что замеряем на бесконечном поле (endless.py): построение и вытеснение кусков
+ENDLESS_METHODS = {
+    "load_chunk": None,
+    "trim": lambda game, args, result: result,
+    "reveal": lambda game, args, result: len(result),
+}
+
+enabled = False
+stats = {}  # "Класс.метод" -> Stat
+
+
+class Stat:
+    """Времена всех вызовов метода и сумма затронутых клеток (None - не считаем)"""
+    __slots__ = ("times", "cells")
+
+    def __init__(self, cells=None):
+        self.times = array("d")
+        self.cells = cells
+
+
+def timed(name, func, cells):
+    """Обертка метода, которая пишет время вызова в stats[name]"""
+    stat = stats.setdefault(name, Stat(None if cells is None else 0))
+    clock = time.perf_counter
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        started = clock()
+        result = func(self, *args, **kwargs)
+        stat.times.append(clock() - started)
+        if cells is not None:
+            stat.cells += cells(self, args, result)
+        return result
+
+    wrapper.profiled = func
+    return wrapper
+
+
+def instrument(cls, methods):
+    """Обернуть методы класса (повторный вызов ничего не делает)"""
+    for method, cells in methods.items():
+        func = getattr(cls, method)
+        if not hasattr(func, "profiled"):
+            setattr(cls, method, timed(f"{cls.__name__}.{method}", func, cells))
+
+
+def enable(path=None):
+    """Включить замеры движка; если задан path - записать отчет в JSON при выходе"""
+    global enabled
+    if not enabled:
+        enabled = True
+        instrument(MinesweeperGame, ENGINE_METHODS)
+    if path:
+        atexit.register(dump, path)
+
+
+def instrument_gui(cls):
+    """Замеры отрисовки, если они включены (окно импортируется отдельно от движка)"""
+    if enabled:
+        instrument(cls, GUI_METHODS)
+
+
+def instrument_endless(cls):
+    """Замеры бесконечного поля, если они включены"""
+    if enabled:
+        instrument(cls, ENDLESS_METHODS)
+
+
+def percentile(times, q):
+    return times[min(len(times) - 1, int(len(times) * q))]
+
+
+def report():
+    """Сводка по каждому замеренному методу, времена в миллисекундах"""
+    result = {}
+    for name, stat in sorted(stats.items()):
+        if not stat.times:
+            continue
+        times = sorted(stat.times)
+        calls = len(times)
+        result[name] = {
+            "calls": calls,
+            "total_ms": round(sum(times) * 1000, 3),
+            "p50_ms": round(percentile(times, 0.5) * 1000, 4),
+            "p99_ms": round(percentile(times, 0.99) * 1000, 4),
+            "max_ms": round(times[-1] * 1000, 4),
+        }
+        if stat.cells is not None:
+            result[name]["cells"] = stat.cells
+            result[name]["cells_per_call"] = round(stat.cells / calls, 1)
+    return result
+
+
+def dump(path):
+    """Записать сводку в JSON"""
+    with open(path, "w") as out:
+        json.dump(report(), out, indent=2, ensure_ascii=False)
+
+
+def snapshot():
+    """Сырые замеры для передачи из процесса-работника (и очистка)"""
+    raw = {name: (stat.times.tolist(), stat.cells) for name, stat in stats.items() if stat.times}
+    for stat in stats.values():
+        stat.times = array("d")
+        stat.cells = None if stat.cells is None else 0
+    return raw
+
+
+def merge(raw):
+    """Добавить замеры, полученные из другого процесса"""
+    for name, (times, cells) in raw.items():
+        stat = stats.setdefault(name, Stat(None if cells is None else 0))
+        stat.times.extend(times)
+        if cells is not None:
+            stat.cells += cells
@@ -0,0 +1,282 @@
+"""Журнал ходов и его повтор без интерфейса: проверка итога, поиск
+проигравшего хода и состояние игры на любом шаге.
+
+Журнал - номер поля и ходы игры (game.moves). Если по номеру поле не
+восстановить (поле из пула, свой генератор, поле без угадывания),
+в журнал пишется и карта мин. Форма поля (тор) - флаг в заголовке. Ходы повторяются через reveal,
+toggle_flag и auto_flag, поэтому повтор идет с той же скоростью, что
+и сама игра, а каждые SNAPSHOT_INTERVAL ходов ставится точка отката.
+"""
+import argparse
+import base64
+import json
+import random
+import struct
+import sys
+import time
+from array import array
+
+from .board import MINE, positions
+from .engine import MOVE_AUTO, MOVE_FLAG, MOVE_HINT, MOVE_REVEAL, MinesweeperGame
+from .storage import unpack_bits
+from .topology import FLAT
+from . import topology
+
+MAGIC = b"MSRL"
+VERSION = 1
+
+# magic, версия, флаги, байт на ход, rows, cols, mines, seed (-1 - нет), число ходов
+HEADER = struct.Struct("<4sBBBIIQqQ")
+
+# Флаги в заголовке
+NO_GUESS = 1
+LAYOUT = 2  # после заголовка идет карта мин
+TORUS = 4  # поле-тор (topology.TORUS)
+
+# Через сколько ходов ставить точку отката для быстрого перехода к шагу
+SNAPSHOT_INTERVAL = 256
+
+# Тип массива по размеру хода в байтах
+TYPECODES = {2: "H", 4: "I", 8: "Q"}
+
+
+class ReplayError(ValueError):
+    """Журнал поврежден или его версия не поддерживается"""
+
+
+def record(game):
+    """Журнал игры: поле и все ходы с начала"""
+    # Номера достаточно, только если поле расставлено обычным образом по нему
+    by_seed = game.seed is not None and game.rng is None and not game.no_guess
+    return {
+        "rows": game.rows,
+        "cols": game.cols,
+        "mines": game.mines,
+        "seed": game.seed,
+        "no_guess": game.no_guess,
+        "topology": game.topology,
+        "layout": None if by_seed or game.first_click else game.field.packed(MINE),
+        "moves": array("Q", game.moves),
+    }
+
+
+def encode(log):
+    """Журнал в байты: ход занимает 2, 4 или 8 байт в зависимости от размера поля"""
+    cells = log["rows"] * log["cols"]
+    width = next(w for w in (2, 4, 8) if cells * 4 <= 1 << 8 * w)
+    flags = ((NO_GUESS if log["no_guess"] else 0) | (LAYOUT if log["layout"] is not None else 0)
+             | (TORUS if log.get("topology") == topology.TORUS else 0))
+    header = HEADER.pack(
+        MAGIC, VERSION, flags, width, log["rows"], log["cols"], log["mines"],
+        -1 if log["seed"] is None else log["seed"], len(log["moves"]),
+    )
+    return header + (log["layout"] or b"") + array(TYPECODES[width], log["moves"]).tobytes()
+
+
+def decode(data):
+    """Журнал из байтов (encode)"""
+    if len(data) < HEADER.size:
+        raise ReplayError("журнал слишком короткий")
+    magic, version, flags, width, rows, cols, mines, seed, count = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ReplayError("это не журнал ходов")
+    if version != VERSION:
+        raise ReplayError(f"неподдерживаемая версия журнала: {version}")
+    if width not in TYPECODES:
+        raise ReplayError(f"неверный размер хода: {width}")
+    start = HEADER.size
+    layout = None
+    if flags & LAYOUT:
+        layout = bytes(data[start:start + (rows * cols + 7) // 8])
+        start += len(layout)
+    if len(data) < start + width * count:
+        raise ReplayError("журнал обрезан")
+    moves = array(TYPECODES[width])
+    moves.frombytes(data[start:start + width * count])
+    return {
+        "rows": rows, "cols": cols, "mines": mines,
+        "seed": None if seed < 0 else seed,
+        "no_guess": bool(flags & NO_GUESS),
+        "topology": topology.TORUS if flags & TORUS else FLAT,
+        "layout": layout,
+        "moves": array("Q", moves),
+    }
+
+
+def dumps(game):
+    """Журнал игры строкой base64 (для JSON)"""
+    return base64.b64encode(encode(record(game))).decode("ascii")
+
+
+def loads(text):
+    """Журнал из строки base64"""
+    return decode(base64.b64decode(text))
+
+
+def save(game, path):
+    """Записать журнал игры в файл"""
+    with open(path, "wb") as out:
+        out.write(encode(record(game)))
+
+
+def load(path):
+    """Прочитать журнал из файла"""
+    with open(path, "rb") as source:
+        return decode(source.read())
+
+
+class Replay:
+    """Повтор журнала на одной игре. Каждые interval ходов ставится точка
+    отката (game.snapshot), поэтому переход к любому шагу - откат к
+    ближайшей точке и не больше interval ходов вперед, а память растет
+    только на измененные клетки, а не на копии всего поля"""
+
+    def __init__(self, log, interval=SNAPSHOT_INTERVAL):
+        self.log = log
+        self.moves = log["moves"]
+        self.interval = interval
+        self.game = self.start()
+        self.step = 0  # сколько ходов применено к self.game
+        self.snapshots = [self.game.snapshot()]  # snapshots[k] - после k * interval ходов
+        self.lost_at = None
+
+    def start(self):
+        """Игра до первого хода"""
+        log = self.log
+        game = MinesweeperGame(log["rows"], log["cols"], log["mines"],
+                               topology=log.get("topology", FLAT))
+        game.new_game(log["seed"])
+        game.no_guess = log["no_guess"]
+        if log["layout"] is not None:
+            # Мины известны заранее - ставим их сразу, первый клик их не трогает
+            game.lay_mines(positions(unpack_bits(log["layout"], game.rows * game.cols)))
+            game.seed = log["seed"]
+            game.seed_used = True
+            game.first_click = False
+            game.game_started = True
+            game.start_time = time.time()
+        return game
+
+    def apply(self, game, move):
+        """Повторить один ход"""
+        kind = move & 3
+        row, col = divmod(move >> 2, game.cols)
+        if kind == MOVE_REVEAL:
+            game.reveal(row, col)
+        elif kind == MOVE_FLAG:
+            game.toggle_flag(row, col)
+        elif kind == MOVE_HINT:
+            game.record(MOVE_HINT, row, col)  # подсказка поле не меняет
+        elif kind == MOVE_AUTO:
+            game.auto_flag()
+        if game.check_game_over() or game.check_win():
+            game.game_over = True
+
+    def seek(self, step):
+        """Перевести игру повтора на шаг step и вернуть ее (не менять снаружи)"""
+        step = max(0, min(step, len(self.moves)))
+        game, interval = self.game, self.interval
+        if step < self.step:
+            k = step // interval
+            game.restore(self.snapshots[k])
+            del self.snapshots[k + 1:]
+            self.step = k * interval
+        apply, moves = self.apply, self.moves
+        # Ход, открывший мину, любой проход встречает, начав с состояния до него
+        track = self.lost_at is None and game.exploded is None
+        for n in range(self.step, step):
+            apply(game, moves[n])
+            if track and game.exploded is not None:
+                self.lost_at = n
+                track = False
+            if (n + 1) % interval == 0 and (n + 1) // interval == len(self.snapshots):
+                self.snapshots.append(game.snapshot())
+        self.step = step
+        return game
+
+    def state_at(self, step):
+        """Копия игры после первых step ходов (без журнала отката)"""
+        game = self.seek(step).copy()
+        game.journal = None
+        return game
+
+    def run(self):
+        """Игра после всех ходов журнала (не менять снаружи)"""
+        return self.seek(len(self.moves))
+
+    def losing_move(self):
+        """Номер хода, которым открыта мина, и его клетка - или None"""
+        self.run()
+        if self.lost_at is None:
+            return None
+        return self.lost_at, divmod(self.moves[self.lost_at] >> 2, self.log["cols"])
+
+    def verify(self, expected):
+        """Сравнить итог повтора с итогом игры (словарь как у simulate.play_game).
+        Возвращает список расхождений"""
+        game = self.run()
+        actual = {
+            "board": game.fingerprint(),
+            "win": game.check_win(),
+            "revealed": game.revealed_count,
+        }
+        return [f"{key}: {expected[key]!r} != {value!r}"
+                for key, value in actual.items() if key in expected and expected[key] != value]
+
+
+def main(argv):
+    """python -m minesweeper replay FILE ... - повтор журналов пакетного прогона"""
+    parser = argparse.ArgumentParser(prog="minesweeper replay",
+                                     description="Повтор и проверка журналов ходов")
+    parser.add_argument("path", help="JSON Lines из play-headless --log ('-' - stdin)")
+    parser.add_argument("--interval", type=int, default=SNAPSHOT_INTERVAL,
+                        help="через сколько ходов ставить точку отката")
+    parser.add_argument("--seek", type=int, default=0,
+                        help="сколько переходов к случайному шагу замерить в каждой игре")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.path == "-" else open(args.path)
+    games = events = lost = 0
+    mismatches = []
+    replay_time = seek_time = 0.0
+    seeks = 0
+    try:
+        for line in source:
+            result = json.loads(line)
+            if "log" not in result:
+                continue
+            log = loads(result["log"])
+            started = time.perf_counter()
+            replay = Replay(log, args.interval)
+            errors = replay.verify(result)
+            if replay.losing_move() is not None:
+                lost += 1
+            replay_time += time.perf_counter() - started
+            games += 1
+            events += len(log["moves"])
+            if errors:
+                mismatches.append(result.get("seed"))
+                print(f"seed {result.get('seed')}: {'; '.join(errors)}", file=sys.stderr)
+
+            # Переходы к случайным шагам, назад и вперед
+            steps = [random.randrange(len(log["moves"]) + 1) for _ in range(args.seek)]
+            started = time.perf_counter()
+            for step in steps:
+                replay.seek(step)
+            seek_time += time.perf_counter() - started
+            seeks += args.seek
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    print(json.dumps({
+        "games": games,
+        "events": events,
+        "lost": lost,
+        "mismatches": len(mismatches),
+        "replay_time": round(replay_time, 3),
+        "events_per_sec": round(events / replay_time) if replay_time else 0,
+        "seek_ms": round(seek_time / seeks * 1000, 3) if seeks else None,
+    }))
+    if mismatches:
+        sys.exit(1)
@@ -0,0 +1,418 @@
+"""Сервер многих игр в одном процессе (asyncio) для турниров и боев ботов.
+
+Протокол - JSON Lines по TCP или Unix-сокету: одна строка - один запрос
+{"id": ..., "op": ..., ...}, в ответ строка с тем же id.
+
+    new    rows, cols, mines, [seed], [no_guess], [topology] -> session, seed
+    reveal session, row, col  -> изменения поля и статус
+    flag   session, row, col  -> изменения поля и статус
+    chord  session, row, col  -> изменения поля и статус (открыть соседей числа)
+    moves  session, moves     -> пачка ходов [["reveal"|"flag"|"chord", row, col], ...]
+                                 за один запрос, общий итог как у одного хода
+    hint   session            -> row, col подсказки (или null), поля до HINT_MAX_CELLS
+    state  session            -> все поле строкой, статус и no_guess (false, если
+                                 поле без угадывания не нашлось за NO_GUESS_BUDGET)
+    close  session
+    stats                     -> счетчики сервера
+
+Изменения поля - "cells" (индексы клеток row * cols + col) и "view" (по
+символу на клетку, как в state): "0"-"8" открытое число, "." скрытая,
+"F" флаг, "*" мина. Ошибка - ответ с полем "error".
+
+Запросы всех соединений, пришедшие за один проход цикла событий,
+обрабатываются одной пачкой, ответы каждому соединению уходят одной
+записью. Игры, к которым долго не обращались, "паркуются" - хранятся
+сжатыми (storage.dumps, 3 бита на клетку), а совсем старые удаляются.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import traceback
+from collections import OrderedDict
+
+from . import storage
+from .board import COUNT_MASK, FLAG, MINE, REVEALED
+from .engine import ACTION_CHORD, ACTION_FLAG, ACTION_REVEAL, MinesweeperGame
+from .noguess import NO_GUESS_MAX_CELLS
+from .topology import FLAT, TOPOLOGIES
+
+# Через сколько секунд без запросов игра паркуется и удаляется
+PARK_AFTER = 30.0
+EVICT_AFTER = 3600.0
+
+# Сколько игр держать всего (самые давние удаляются), предел размера поля
+# и сколько ходов можно прислать одним запросом moves
+MAX_SESSIONS = 100000
+MAX_CELLS = 1000000
+MAX_BATCH_MOVES = 10000
+
+# Как часто проверять простаивающие игры, секунд, и сколько игр парковать
+# за раз (парковка ~20 мкс на игру эксперта, цикл событий не должен вставать)
+HOUSEKEEPING_INTERVAL = 1.0
+PARK_BATCH = 2000
+
+# Поиск поля без угадывания идет прямо в цикле событий (при первом открытии):
+# не дольше стольких секунд, дальше - обычное поле (в state no_guess: false)
+NO_GUESS_BUDGET = 0.2
+
+# Подсказка считается прямо в цикле событий: на поле 100x100 - до ~20 мс,
+# на 1000x1000 - секунды, поэтому только для полей до стольких клеток
+HINT_MAX_CELLS = 10000
+
+# Номер поля хранится в сохранении как int64 (-1 - нет номера)
+MAX_SEED = 2 ** 63
+
+# Таблица для bytes.translate: байт клетки -> символ для клиента
+VIEW_TABLE = bytes(
+    ord("*") if b & REVEALED and b & MINE
+    else ord("0") + (b & COUNT_MASK) if b & REVEALED
+    else ord("F") if b & FLAG
+    else ord(".")
+    for b in range(256)
+)
+
+
+class ProtocolError(ValueError):
+    """Неверный запрос клиента (текст уходит клиенту в поле error)"""
+
+
+class Session:
+    """Игра на сервере: в памяти или запаркованная в байтах"""
+    __slots__ = ("game", "parked", "moves", "last_used", "park_failed")
+
+    def __init__(self, game):
+        self.game = game
+        self.parked = None  # storage.dumps(game), пока игра запаркована
+        self.moves = None  # журнал ходов запаркованной игры
+        self.last_used = time.monotonic()
+        self.park_failed = False  # парковка упала - игра остается в памяти
+
+
+class GameServer:
+    """Игры и обработка запросов (без сети - ее добавляет serve)"""
+
+    def __init__(self, park_after=PARK_AFTER, evict_after=EVICT_AFTER, max_sessions=MAX_SESSIONS):
+        self.park_after = park_after
+        self.evict_after = evict_after
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()  # id -> Session, от давно не использованных к свежим
+        self.next_id = 1
+
+        # Запросы текущего прохода цикла событий: (writer, строка)
+        self.batch = []
+        self.scheduled = False
+
+        # Счетчики
+        self.requests = 0
+        self.batches = 0
+        self.parked = 0
+        self.unparked = 0
+        self.evicted = 0
+        self.park_errors = 0
+
+    # Пачки запросов
+
+    def submit(self, writer, line):
+        """Принять строку запроса; обработка - в конце прохода цикла событий"""
+        self.batch.append((writer, line))
+        if not self.scheduled:
+            self.scheduled = True
+            asyncio.get_running_loop().call_soon(self.process)
+
+    def process(self):
+        """Обработать все накопленные запросы, ответы - одной записью на соединение"""
+        batch, self.batch = self.batch, []
+        self.scheduled = False
+        self.batches += 1
+        self.requests += len(batch)
+        replies = {}
+        for writer, line in batch:
+            replies.setdefault(writer, []).append(self.handle_line(line))
+        for writer, lines in replies.items():
+            if not writer.is_closing():
+                writer.write(b"".join(lines))
+
+    def handle_line(self, line):
+        """Одна строка запроса -> строка ответа"""
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ProtocolError("запрос должен быть объектом JSON")
+            request_id = request.get("id")
+            response = self.dispatch(request)
+        except ProtocolError as error:
+            response = {"error": str(error)}
+        except (TypeError, ValueError, OverflowError) as error:  # JSONDecodeError, Infinity, 1e400
+            response = {"error": f"неверный запрос: {error}"}
+        except Exception as error:
+            # Ошибка в одной строке не должна оставить без ответа всю пачку
+            print(f"Ошибка обработки запроса {line[:200]!r}:", file=sys.stderr)
+            traceback.print_exc()
+            response = {"error": f"ошибка сервера: {error}"}
+        response["id"] = request_id
+        return (json.dumps(response, separators=(",", ":")) + "\n").encode()
+
+    def dispatch(self, request):
+        op = request.get("op")
+        handler = getattr(self, f"op_{op}", None) if isinstance(op, str) else None
+        if handler is None:
+            raise ProtocolError(f"неизвестная операция: {op}")
+        return handler(request)
+
+    # Операции
+
+    def op_new(self, request):
+        rows, cols, mines = (int(request.get(key, default)) for key, default in
+                             (("rows", 9), ("cols", 9), ("mines", 10)))
+        if not (0 < rows and 0 < cols and rows * cols <= MAX_CELLS):
+            raise ProtocolError(f"размер поля от 1 до {MAX_CELLS} клеток")
+        if not 0 < mines <= rows * cols - 9:
+            raise ProtocolError("мин должно быть от 1 до числа клеток минус 9")
+        topology = request.get("topology", FLAT)
+        if topology not in TOPOLOGIES:
+            raise ProtocolError(f"форма поля: {', '.join(TOPOLOGIES)}")
+        seed = request.get("seed")
+        if seed is not None:
+            seed = int(seed)
+            if not 0 <= seed < MAX_SEED:
+                raise ProtocolError(f"номер поля от 0 до {MAX_SEED - 1}")
+        no_guess = bool(request.get("no_guess"))
+        if no_guess and rows * cols > NO_GUESS_MAX_CELLS:
+            raise ProtocolError(f"no_guess - только для полей до {NO_GUESS_MAX_CELLS} клеток")
+        game = MinesweeperGame(rows, cols, mines, topology=topology)
+        game.new_game(seed)
+        game.no_guess = no_guess
+        game.no_guess_budget = NO_GUESS_BUDGET
+
+        while len(self.sessions) >= self.max_sessions:
+            self.sessions.popitem(last=False)
+            self.evicted += 1
+        session_id = self.next_id
+        self.next_id += 1
+        self.sessions[session_id] = Session(game)
+        return {"session": session_id, "seed": game.seed}
+
+    def op_reveal(self, request):
+        game, row, col = self.move_target(request)
+        return self.delta(game, game.apply_moves([(ACTION_REVEAL, row, col)]))
+
+    def op_flag(self, request):
+        game, row, col = self.move_target(request)
+        return self.delta(game, game.apply_moves([(ACTION_FLAG, row, col)]))
+
+    def op_chord(self, request):
+        game, row, col = self.move_target(request)
+        return self.delta(game, game.apply_moves([(ACTION_CHORD, row, col)]))
+
+    def op_moves(self, request):
+        game = self.game(request)
+        moves = request.get("moves")
+        if not isinstance(moves, list) or not 0 < len(moves) <= MAX_BATCH_MOVES:
+            raise ProtocolError(f"moves - список от 1 до {MAX_BATCH_MOVES} ходов")
+        batch = []
+        for action, row, col in moves:
+            row, col = int(row), int(col)
+            if not (0 <= row < game.rows and 0 <= col < game.cols):
+                raise ProtocolError("клетка вне поля")
+            batch.append((action, row, col))
+        if game.game_over:
+            raise ProtocolError("игра окончена")
+        return self.delta(game, game.apply_moves(batch))
+
+    def op_hint(self, request):
+        game = self.game(request)
+        if game.rows * game.cols > HINT_MAX_CELLS:
+            raise ProtocolError(f"подсказка - только для полей до {HINT_MAX_CELLS} клеток")
+        if game.first_click or game.game_over:
+            return {"hint": None}
+        return {"hint": game.get_hint()}
+
+    def op_state(self, request):
+        game = self.game(request)
+        return {
+            "rows": game.rows, "cols": game.cols, "mines": game.mines, "seed": game.seed,
+            "view": game.field.data.translate(VIEW_TABLE).decode("ascii"),
+            "status": game.result(), "mines_left": game.mines - game.flag_count,
+            "no_guess": game.no_guess,
+        }
+
+    def op_close(self, request):
+        if self.sessions.pop(self.session_id(request), None) is None:
+            raise ProtocolError("нет такой игры")
+        return {}
+
+    def op_stats(self, request):
+        return self.stats()
+
+    # Игры
+
+    def session_id(self, request):
+        try:
+            return int(request["session"])
+        except (KeyError, TypeError, ValueError):
+            raise ProtocolError("нужен номер игры (session)") from None
+
+    def game(self, request):
+        """Игра запроса (запаркованная разворачивается)"""
+        session_id = self.session_id(request)
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise ProtocolError("нет такой игры (или она удалена за простой)")
+        self.sessions.move_to_end(session_id)
+        session.last_used = time.monotonic()
+        if session.game is None:
+            self.unpark(session)
+        return session.game
+
+    def move_target(self, request):
+        """Игра и клетка хода с проверкой"""
+        game = self.game(request)
+        try:
+            row, col = int(request["row"]), int(request["col"])
+        except (KeyError, TypeError, ValueError):
+            raise ProtocolError("нужны row и col") from None
+        if not (0 <= row < game.rows and 0 <= col < game.cols):
+            raise ProtocolError("клетка вне поля")
+        if game.game_over:
+            raise ProtocolError("игра окончена")
+        return game, row, col
+
+    def delta(self, game, result):
+        """Ответ на ходы: итог apply_moves - измененные клетки и статус игры"""
+        cols = game.cols
+        changed = [r * cols + c for r, c in result["changed"]]
+        data = game.field.data
+        return {
+            "cells": changed,
+            "view": bytes(data[i] for i in changed).translate(VIEW_TABLE).decode("ascii"),
+            "status": result["result"],
+            "mines_left": result["mines_left"],
+            "applied": result["applied"],
+        }
+
+    def park(self, session):
+        """Сжать игру в байты (3 бита на клетку), журнал ходов хранится отдельно"""
+        session.parked = storage.dumps(session.game)
+        session.moves = session.game.moves
+        session.game = None
+        self.parked += 1
+
+    def unpark(self, session):
+        game = storage.loads(session.parked)
+        game.moves = session.moves
+        game.no_guess_budget = NO_GUESS_BUDGET
+        session.game = game
+        session.parked = session.moves = None
+        self.unparked += 1
+
+    def housekeeping(self):
+        """Запарковать и удалить простаивающие игры"""
+        now = time.monotonic()
+        expired = []
+        parked = 0
+        # Игры упорядочены по последнему запросу - смотрим только давние
+        for session_id, session in self.sessions.items():
+            idle = now - session.last_used
+            if idle < self.park_after or parked == PARK_BATCH:
+                break
+            if idle >= self.evict_after:
+                expired.append(session_id)
+            elif session.game is not None and not session.park_failed:
+                # Одна сломанная игра не должна останавливать уборку остальных
+                try:
+                    self.park(session)
+                except Exception:
+                    session.park_failed = True
+                    self.park_errors += 1
+                    print(f"Не удалось запарковать игру {session_id}:", file=sys.stderr)
+                    traceback.print_exc()
+                parked += 1
+        for session_id in expired:
+            del self.sessions[session_id]
+        self.evicted += len(expired)
+
+    def stats(self):
+        active = sum(session.game is not None for session in self.sessions.values())
+        return {
+            "sessions": len(self.sessions),
+            "active": active,
+            "parked_now": len(self.sessions) - active,
+            "requests": self.requests,
+            "batches": self.batches,
+            "requests_per_batch": round(self.requests / self.batches, 2) if self.batches else None,
+            "parked": self.parked,
+            "unparked": self.unparked,
+            "evicted": self.evicted,
+            "park_errors": self.park_errors,
+        }
+
+    # Сеть
+
+    async def connection(self, reader, writer):
+        """Одно соединение: строки запросов в общую пачку"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    self.submit(writer, line)
+                # Строки, уже лежащие в буфере, readline отдает без ожидания -
+                # они попадут в ту же пачку; ждем только переполненную запись
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def keep_house(self):
+        while True:
+            await asyncio.sleep(HOUSEKEEPING_INTERVAL)
+            self.housekeeping()
+
+    async def serve(self, host="127.0.0.1", port=8765, unix=None, ready=None):
+        """Слушать TCP (host, port) или Unix-сокет unix до отмены задачи"""
+        if unix:
+            server = await asyncio.start_unix_server(self.connection, unix, limit=1 << 20)
+        else:
+            server = await asyncio.start_server(self.connection, host, port, limit=1 << 20)
+        if ready is not None:
+            ready(server)
+        housekeeping = asyncio.create_task(self.keep_house())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            housekeeping.cancel()
+            if unix and os.path.exists(unix):
+                os.unlink(unix)
+
+
+def main(argv):
+    """python -m minesweeper serve ... - сервер игр"""
+    parser = argparse.ArgumentParser(prog="minesweeper serve", description="Сервер многих игр (JSON Lines)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="путь Unix-сокета вместо TCP")
+    parser.add_argument("--park-after", type=float, default=PARK_AFTER,
+                        help="через сколько секунд простоя парковать игру")
+    parser.add_argument("--evict-after", type=float, default=EVICT_AFTER,
+                        help="через сколько секунд простоя удалять игру")
+    parser.add_argument("--max-sessions", type=int, default=MAX_SESSIONS)
+    args = parser.parse_args(argv)
+
+    server = GameServer(args.park_after, args.evict_after, args.max_sessions)
+    where = args.unix or f"{args.host}:{args.port}"
+
+    def ready(listener):
+        print(f"Сервер слушает {where}", file=sys.stderr, flush=True)
+
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix, ready))
+    except KeyboardInterrupt:
+        pass
+    print(json.dumps(server.stats()), file=sys.stderr)
@@ -0,0 +1,161 @@
+"""Пакетный прогон игр ботами без интерфейса, на всех ядрах"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+from . import profiling, replay
+from .board import HIDDEN_TABLE, positions
+from .engine import ACTION_REVEAL, PLAYING, MinesweeperGame
+from .topology import FLAT, TOPOLOGIES
+
+
+def solver_bot(game):
+    """Бот по умолчанию: первый ход в центр, дальше открывает одной пачкой
+    все клетки, доказанные решателем (auto_flag), а если таких нет - самую безопасную"""
+    if game.first_click:
+        return [(ACTION_REVEAL, game.rows // 2, game.cols // 2)]
+    if not game.safe_cells:
+        game.auto_flag()
+    if game.safe_cells:
+        cell = game.field.cell
+        safe, game.safe_cells = game.safe_cells, set()
+        return [(ACTION_REVEAL, *cell(i)) for i in sorted(safe)]
+    hint = game.get_hint()
+    return [(ACTION_REVEAL, *hint)] if hint else []
+
+
+def random_bot(game):
+    """Бот для сравнения: открывает случайную скрытую клетку без флага"""
+    hidden = positions(game.field.data.translate(HIDDEN_TABLE))
+    return [(ACTION_REVEAL, *game.field.cell(random.choice(hidden)))] if hidden else []
+
+
+# Боты для пакетного прогона (по имени, чтобы передавать в процессы):
+# бот возвращает пачку ходов для apply_moves, пустая пачка - конец игры
+BOTS = {
+    "solver": solver_bot,
+    "random": random_bot,
+}
+
+
+def play_game(seed, rows, cols, mines, bot="solver", no_guess=False, log=False, topology=FLAT):
+    """Сыграть одну игру без интерфейса, возвращает словарь с итогом
+    (log=True - и с журналом ходов для replay)"""
+    random.seed(seed)  # случайные ходы ботов и подсказок
+    policy = BOTS[bot]
+    game = MinesweeperGame(rows, cols, mines, seed=seed, topology=topology)
+    game.new_game()
+    game.no_guess = no_guess
+
+    started = time.perf_counter()
+    thinking = 0.0
+    moves = 0
+    while True:
+        think_start = time.perf_counter()
+        batch = policy(game)
+        thinking += time.perf_counter() - think_start
+        if not batch:
+            break
+        delta = game.apply_moves(batch)
+        moves += delta["applied"]
+        if delta["result"] != PLAYING:
+            break
+
+    result = {
+        "seed": seed,
+        "board": game.fingerprint(),
+        "win": game.check_win(),
+        "moves": moves,
+        "revealed": game.revealed_count,
+        "solver_time": round(thinking, 6),
+        "time": round(time.perf_counter() - started, 6),
+    }
+    if log:
+        result["log"] = replay.dumps(game)
+    return result
+
+
+def play_games(task):
+    """Сыграть пачку игр в процессе-работнике"""
+    seeds, rows, cols, mines, bot, no_guess, log, topology = task
+    return [play_game(seed, rows, cols, mines, bot, no_guess, log, topology) for seed in seeds]
+
+
+def play_games_profiled(task):
+    """То же с замерами: итоги игр и замеры работника для сводки"""
+    return play_games(task), profiling.snapshot()
+
+
+def run_batch(games, rows, cols, mines, bot="solver", workers=None, first_seed=0,
+              chunk=64, out=sys.stdout, no_guess=False, log=False, topology=FLAT):
+    """Прогнать games игр на всех ядрах, результаты по одной строке JSON в out.
+    Возвращает сводку: победы, игр в секунду и загрузку процессов."""
+    # Пул нужен только главному процессу, работникам он не импортируется
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    seeds = range(first_seed, first_seed + games)
+    tasks = [(seeds[i:i + chunk], rows, cols, mines, bot, no_guess, log, topology)
+             for i in range(0, games, chunk)]
+
+    started = time.perf_counter()
+    wins = 0
+    busy = 0.0
+    # С замерами каждый работник включает их у себя и отдает вместе с итогами
+    if profiling.enabled:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=profiling.enable)
+        batches = executor.map(play_games_profiled, tasks)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        batches = ((results, None) for results in executor.map(play_games, tasks))
+    with executor:
+        for results, raw in batches:
+            if raw:
+                profiling.merge(raw)
+            for result in results:
+                wins += result["win"]
+                busy += result["time"]
+                out.write(json.dumps(result) + "\n")
+    wall = time.perf_counter() - started
+
+    # busy / wall - сколько ядер реально было занято играми
+    return {
+        "games": games,
+        "wins": wins,
+        "win_rate": wins / games if games else 0.0,
+        "workers": workers,
+        "wall_time": round(wall, 3),
+        "games_per_sec": round(games / wall, 1) if wall else 0.0,
+        "games_per_sec_per_core": round(games / wall / workers, 1) if wall else 0.0,
+        "parallel_efficiency": round(busy / wall / workers, 3) if wall else 0.0,
+    }
+
+
+def main(argv):
+    """python -m minesweeper play-headless ... - пакетный прогон без интерфейса"""
+    parser = argparse.ArgumentParser(prog="minesweeper play-headless", description="Пакетный прогон игр ботом")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--rows", type=int, default=16)
+    parser.add_argument("--cols", type=int, default=30)
+    parser.add_argument("--mines", type=int, default=99)
+    parser.add_argument("--bot", choices=sorted(BOTS), default="solver")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0, help="первое зерно, дальше по порядку")
+    parser.add_argument("--out", default="-", help="файл JSON Lines ('-' - stdout)")
+    parser.add_argument("--no-guess", action="store_true", help="только поля без угадывания")
+    parser.add_argument("--log", action="store_true", help="писать журнал ходов каждой игры (для replay)")
+    parser.add_argument("--topology", choices=TOPOLOGIES, default=FLAT, help="форма поля (torus - края склеены)")
+    args = parser.parse_args(argv)
+
+    out = sys.stdout if args.out == "-" else open(args.out, "w")
+    try:
+        summary = run_batch(args.games, args.rows, args.cols, args.mines, args.bot,
+                            args.workers, args.seed, out=out, no_guess=args.no_guess, log=args.log,
+                            topology=args.topology)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(json.dumps(summary), file=sys.stderr)
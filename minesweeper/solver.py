@@ -0,0 +1,306 @@
+"""Логический решатель и вероятности мин на границе открытой области"""
+from collections import deque
+from functools import lru_cache
+from math import exp, lgamma, log
+
+from .board import COUNT_MASK, FLAG, REVEALED
+
+
+# Настройки анализа вероятностей
+COMPONENT_CACHE_SIZE = 4096  # сколько разобранных компонент границы помнить
+COMPONENT_BUDGET = 50000  # предел состояний перебора на одну компоненту
+EXACT_COMBINE_LIMIT = 2000000  # предел работы точного объединения компонент
+
+
+@lru_cache(maxsize=COMPONENT_CACHE_SIZE)
+def component_solutions(size, constraints):
+    """Все расстановки мин в компоненте границы.
+
+    Клетки пронумерованы 0..size-1, constraints - кортеж пар
+    (кортеж клеток, сколько среди них мин). Возвращает кортеж троек
+    (k, число решений с k минами, сколько из них с миной в каждой клетке)
+    или None, если перебор слишком большой. Клетки перебираются по
+    порядку, одинаковые состояния незакрытых ограничений считаются один раз.
+    """
+    need = [mines for cells, mines in constraints]
+    left = [len(cells) for cells, mines in constraints]
+    cell_constraints = [[] for _ in range(size)]
+    for ci, (cells, mines) in enumerate(constraints):
+        for x in cells:
+            cell_constraints[x].append(ci)
+
+    # Ограничения, начатые до клетки x и еще не законченные
+    active = [[] for _ in range(size + 1)]
+    for ci, (cells, mines) in enumerate(constraints):
+        for x in range(min(cells) + 1, max(cells) + 1):
+            active[x].append(ci)
+
+    memo = {}
+
+    def go(x):
+        if x == size:
+            return {0: (1, ())}
+        key = (x, tuple(need[ci] for ci in active[x]))
+        if key in memo:
+            return memo[key]
+        if len(memo) > COMPONENT_BUDGET:
+            raise OverflowError
+
+        result = {}
+        for mine in (0, 1):
+            for ci in cell_constraints[x]:
+                left[ci] -= 1
+                need[ci] -= mine
+            if all(0 <= need[ci] <= left[ci] for ci in cell_constraints[x]):
+                for k, (count, counts) in go(x + 1).items():
+                    counts = (count if mine else 0,) + counts
+                    if k + mine in result:
+                        total, old = result[k + mine]
+                        count += total
+                        counts = tuple(a + b for a, b in zip(old, counts))
+                    result[k + mine] = (count, counts)
+            for ci in cell_constraints[x]:
+                left[ci] += 1
+                need[ci] += mine
+
+        memo[key] = result
+        return result
+
+    try:
+        solutions = go(0)
+    except (OverflowError, RecursionError):
+        return None
+    return tuple((k, count, counts) for k, (count, counts) in sorted(solutions.items()))
+
+
+def log_comb(n, k):
+    """Логарифм числа сочетаний из n по k"""
+    return lgamma(n + 1) - lgamma(k + 1) - lgamma(n - k + 1)
+
+
+def convolve(a, b):
+    """Распределение суммы мин двух независимых частей (с нормировкой)"""
+    result = [0.0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                result[i + j] += x * y
+    top = max(result) or 1.0
+    return [x / top for x in result]
+
+
+def combine_exact(components, mines, interior):
+    """Точное объединение компонент: на каждое число мин на границе
+    приходится C(interior, mines - m) вариантов для внутренних клеток.
+    Возвращает (вероятности по компонентам, вероятность внутри) или None."""
+    dists = []
+    for solutions in components:
+        top = max(count for k, count, counts in solutions)
+        dist = [0.0] * (solutions[-1][0] + 1)
+        for k, count, counts in solutions:
+            dist[k] = count / top
+        dists.append(dist)
+
+    # Распределение мин во всех компонентах, кроме c = префикс * суффикс
+    prefix = [[1.0]]
+    for dist in dists:
+        prefix.append(convolve(prefix[-1], dist))
+    suffix = [[1.0]]
+    for dist in reversed(dists):
+        suffix.append(convolve(suffix[-1], dist))
+    suffix.reverse()
+
+    logs = [log_comb(interior, mines - m) if 0 <= mines - m <= interior else None
+            for m in range(len(prefix[-1]))]
+    if all(w is None for w in logs):
+        return None  # флаги игрока не сходятся с количеством мин
+    top = max(w for w in logs if w is not None)
+    binomial = [exp(w - top) if w is not None else 0.0 for w in logs]
+
+    total = [x * w for x, w in zip(prefix[-1], binomial)]
+    norm = sum(total)
+    if not norm:
+        return None
+    interior_probability = None
+    if interior:
+        interior_probability = sum(x * (mines - m) for m, x in enumerate(total)) / norm / interior
+
+    probabilities = []
+    for c, solutions in enumerate(components):
+        rest = convolve(prefix[c], suffix[c + 1])
+        cells = [0.0] * len(solutions[0][2])
+        norm = 0.0
+        for k, count, counts in solutions:
+            weight = sum(x * binomial[k + m] for m, x in enumerate(rest) if x)
+            norm += count * weight
+            for x, n in enumerate(counts):
+                cells[x] += n * weight
+        if not norm:
+            return None
+        probabilities.append([p / norm for p in cells])
+    return probabilities, interior_probability
+
+
+def combine_approximate(components, mines, interior):
+    """Приближенное объединение для огромной границы: компоненты считаем
+    независимыми, а общий множитель шансов мины подбираем так, чтобы
+    ожидаемое число мин совпало с оставшимся."""
+    # Одинаковые компоненты (общий результат из кэша) считаем один раз
+    repeats = {}
+    for solutions in components:
+        if id(solutions) in repeats:
+            repeats[id(solutions)][1] += 1
+        else:
+            repeats[id(solutions)] = [solutions, 1]
+
+    def weights(solutions, odds):
+        logs = [log(count) + k * log(odds) for k, count, counts in solutions]
+        top = max(logs)
+        return [exp(w - top) for w in logs]
+
+    def expected(odds):
+        total = interior * odds / (1 + odds) if interior else 0.0
+        for solutions, repeat in repeats.values():
+            w = weights(solutions, odds)
+            total += repeat * sum(k * x for (k, count, counts), x in zip(solutions, w)) / sum(w)
+        return total
+
+    # Ожидаемое число мин растет вместе с шансами - ищем делением пополам
+    low, high = -30.0, 30.0
+    for _ in range(40):
+        middle = (low + high) / 2
+        if expected(exp(middle)) < mines:
+            low = middle
+        else:
+            high = middle
+    odds = exp((low + high) / 2)
+
+    results = {}
+    for key, (solutions, repeat) in repeats.items():
+        w = weights(solutions, odds)
+        norm = sum(w)
+        cells = [0.0] * len(solutions[0][2])
+        for (k, count, counts), x in zip(solutions, w):
+            for n, c in enumerate(counts):
+                cells[n] += c / count * x
+        results[key] = [p / norm for p in cells]
+    return [results[id(solutions)] for solutions in components], odds / (1 + odds) if interior else None
+
+
+class Solver:
+    """Логический решатель: смотрит только на границу открытых чисел
+    и перепроверяет соседей тех клеток, которые изменились"""
+
+    def __init__(self, game):
+        self.game = game
+        self.field = game.field
+        self.data = game.field.data
+        self.table = game.field.table
+        self.safe = game.safe_cells
+
+    def constraint(self, i):
+        """Неизвестные соседи числа и сколько мин среди них осталось"""
+        data = self.data
+        unknown = []
+        mines = data[i] & COUNT_MASK
+        for j in self.table[i]:
+            if data[j] & FLAG:
+                mines -= 1
+            elif not data[j] & REVEALED and j not in self.safe:
+                unknown.append(j)
+        return unknown, mines
+
+    def solve(self):
+        data = self.data
+        field = self.field
+        table = self.table
+        frontier = self.game.frontier
+        flags = []
+
+        # Что изменилось - для журнала отката (game.snapshot/restore)
+        self.pending = self.game.pending  # прежняя очередь проверки
+        self.flagged = flagged = []  # индексы новых флагов
+        self.solved = solved = []  # числа, убранные из границы
+        self.found = found = []  # новые безопасные клетки
+
+        # Начинаем только с чисел, рядом с которыми что-то изменилось. По порядку
+        # индексов: выводы не должны зависеть от истории множества (копии, откат)
+        queue = deque(sorted(self.pending))
+        queued = set(self.pending)
+        self.game.pending = set()
+
+        def changed(j):
+            # Клетка решена - перепроверяем открытые числа вокруг нее
+            for k in table[j]:
+                if k in frontier and k not in queued:
+                    queued.add(k)
+                    queue.append(k)
+
+        def mark_mines(cells):
+            for j in cells:
+                if not data[j] & FLAG:
+                    data[j] |= FLAG
+                    self.game.flag_count += 1
+                    self.game.hidden_count -= 1
+                    flags.append(field.cell(j))
+                    flagged.append(j)
+                    changed(j)
+
+        def mark_safe(cells):
+            for j in cells:
+                if j not in self.safe:
+                    self.safe.add(j)
+                    found.append(j)
+                    changed(j)
+
+        while queue:
+            i = queue.popleft()
+            queued.discard(i)
+
+            unknown, mines = self.constraint(i)
+            if not unknown:
+                if i in frontier:
+                    frontier.discard(i)
+                    solved.append(i)
+                continue
+            if not 0 <= mines <= len(unknown):
+                continue  # неверные флаги игрока - из этого числа ничего не выводим
+
+            # Простые правила: все соседи мины или все безопасны
+            if mines == 0:
+                mark_safe(unknown)
+                continue
+            if mines == len(unknown):
+                mark_mines(unknown)
+                continue
+
+            # Пары соседних чисел с общими неизвестными клетками.
+            # Если в A минус B столько же клеток, сколько разница мин,
+            # то A минус B - мины, а B минус A - безопасны
+            # (сюда же попадает случай, когда одно множество внутри другого)
+            unknown_set = set(unknown)
+            others = set()
+            for j in unknown:
+                for k in table[j]:
+                    if k != i and k in frontier:
+                        others.add(k)
+
+            for k in others:
+                other, other_mines = self.constraint(k)
+                if not other or not 0 <= other_mines <= len(other):
+                    continue
+                other_set = set(other)
+                only_here = unknown_set - other_set
+                only_there = other_set - unknown_set
+                if mines - other_mines == len(only_here):
+                    mark_mines(only_here)
+                    mark_safe(only_there)
+                elif other_mines - mines == len(only_there):
+                    mark_mines(only_there)
+                    mark_safe(only_here)
+                else:
+                    continue
+                if only_here or only_there:
+                    break
+
+        return flags, [field.cell(j) for j in self.safe]
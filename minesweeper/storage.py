@@ -0,0 +1,287 @@
+"""Сохранение игры в двоичный файл: три битовые карты (мины, открытые,
+флаги) - около 3 бит на клетку. Загрузка целиком в память (load) или
+без копирования через mmap (open_mapped) для огромных полей.
+
+Формат (little-endian): заголовок HEADER, карта мин, карта открытых,
+карта флагов (по (rows * cols + 7) // 8 байт, порядок битов как в
+pack_bits), затем индексы чисел границы (uint64).
+"""
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+from .board import FLAG, HAS_NUMPY, MINE, REVEALED, Board, numpy, pack_bits, positions
+from .engine import NUMPY_MIN_CELLS, MinesweeperGame
+from .topology import FLAT, neighbour_table
+from . import topology
+
+MAGIC = b"MSWP"
+VERSION = 1
+
+# magic, версия, флаги состояния, rows, cols, mines, seed (-1 - нет),
+# открыто, флагов, скрыто, взорванная клетка (-1 - нет), длина границы, время
+HEADER = struct.Struct("<4sHHIIQqQQQqQd")
+
+# Флаги состояния в заголовке
+GAME_OVER = 1
+FIRST_CLICK = 2
+HINT_AVAILABLE = 4
+NO_GUESS = 8
+TORUS = 16  # поле-тор (topology.TORUS)
+
+
+class StorageError(ValueError):
+    """Файл не похож на сохраненную игру или его версия не поддерживается"""
+
+
+def save(game, path):
+    """Сохранить игру в файл"""
+    with open(path, "wb") as out:
+        out.write(dumps(game))
+
+
+def dumps(game):
+    """Игра в байтах того же формата, что и файл"""
+    state = ((GAME_OVER if game.game_over else 0) | (FIRST_CLICK if game.first_click else 0)
+             | (HINT_AVAILABLE if game.hint_available else 0) | (NO_GUESS if game.no_guess else 0)
+             | (TORUS if game.topology == topology.TORUS else 0))
+    elapsed = time.time() - game.start_time if game.game_started else 0.0
+    frontier = array("Q", sorted(game.frontier))
+    if sys.byteorder == "big":
+        frontier.byteswap()  # в файле - little-endian
+    header = HEADER.pack(
+        MAGIC, VERSION, state, game.rows, game.cols, game.mines,
+        -1 if game.seed is None else game.seed,
+        game.revealed_count, game.flag_count, game.hidden_count,
+        -1 if game.exploded is None else game.exploded,
+        len(frontier), elapsed,
+    )
+    field = game.field
+    return b"".join([header] + [field.packed(mask) for mask in (MINE, REVEALED, FLAG)]
+                    + [frontier.tobytes()])
+
+
+def read_header(buffer):
+    """Заголовок файла как словарь (с проверкой формата)"""
+    if len(buffer) < HEADER.size:
+        raise StorageError("файл слишком короткий")
+    (magic, version, state, rows, cols, mines, seed, revealed, flags, hidden,
+     exploded, frontier, elapsed) = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise StorageError("это не сохраненная игра")
+    if version != VERSION:
+        raise StorageError(f"неподдерживаемая версия формата: {version}")
+    bitmap = (rows * cols + 7) // 8
+    if len(buffer) < HEADER.size + 3 * bitmap + 8 * frontier:
+        raise StorageError("файл обрезан")
+    return {
+        "state": state, "rows": rows, "cols": cols, "mines": mines,
+        "seed": None if seed < 0 else seed, "revealed": revealed, "flags": flags,
+        "hidden": hidden, "exploded": None if exploded < 0 else exploded,
+        "frontier": frontier, "elapsed": elapsed, "bitmap": bitmap,
+        "topology": topology.TORUS if state & TORUS else FLAT,
+    }
+
+
+def restore(header, field, buffer):
+    """Игра с полем field и состоянием из заголовка"""
+    # Игра создается с пустым полем: готовое поле подставляем, а не выделяем заново
+    game = MinesweeperGame(0, 0, header["mines"], seed=header["seed"])
+    game.rows, game.cols = header["rows"], header["cols"]
+    game.topology = header["topology"]
+    game.field = field
+    state = header["state"]
+    game.game_over = bool(state & GAME_OVER)
+    game.first_click = bool(state & FIRST_CLICK)
+    game.game_started = not game.first_click
+    game.seed_used = game.game_started
+    game.hint_available = bool(state & HINT_AVAILABLE)
+    game.no_guess = bool(state & NO_GUESS)
+    game.start_time = time.time() - header["elapsed"]
+    game.revealed_count = header["revealed"]
+    game.flag_count = header["flags"]
+    game.hidden_count = header["hidden"]
+    game.exploded = header["exploded"]
+
+    start = HEADER.size + 3 * header["bitmap"]
+    frontier = array("Q")
+    frontier.frombytes(buffer[start:start + 8 * header["frontier"]])
+    if sys.byteorder == "big":
+        frontier.byteswap()
+    game.frontier = set(frontier)
+    game.pending = set(frontier)
+    return game
+
+
+def load(path):
+    """Загрузить игру целиком в память (обычное поле, байт на клетку)"""
+    with open(path, "rb") as source:
+        return loads(source.read())
+
+
+def loads(buffer):
+    """Игра из байтов (dumps или содержимое файла)"""
+    header = read_header(buffer)
+    rows, cols, bitmap = header["rows"], header["cols"], header["bitmap"]
+    cells = rows * cols
+    mines_start = HEADER.size
+
+    # Мины и числа вокруг них - как при обычной расстановке
+    game = restore(header, Board(rows, cols, header["topology"]), buffer)
+    game.use_numpy = HAS_NUMPY and cells >= NUMPY_MIN_CELLS
+    if game.use_numpy:
+        np = numpy()
+
+        def layer(n):
+            packed = np.frombuffer(buffer, np.uint8, bitmap, mines_start + n * bitmap)
+            return np.unpackbits(packed)[:cells]
+
+        game.lay_mines(np.flatnonzero(layer(0)))
+        grid = game.field.array().reshape(-1)
+        grid |= layer(1) * np.uint8(REVEALED) | layer(2) * np.uint8(FLAG)
+        return game
+
+    game.lay_mines(positions(unpack_bits(buffer[mines_start:mines_start + bitmap], cells)))
+
+    # Биты открытых клеток и флагов накладываем одной операцией над большими числами
+    data = game.field.data
+    state = 0
+    for n, bit in ((1, REVEALED), (2, FLAG)):
+        start = mines_start + n * bitmap
+        layer = unpack_bits(buffer[start:start + bitmap], cells)
+        state |= int.from_bytes(layer.translate(bytes((0, bit)) + bytes(254)), "big")
+    data[:] = (int.from_bytes(data, "big") | state).to_bytes(cells, "big")
+    return game
+
+
+def unpack_bits(bitmap, cells):
+    """Битовая карта -> байт на клетку (0 или 1)"""
+    if not cells:
+        return b""
+    bits = int.from_bytes(bitmap, "big") >> (-cells % 8)
+    return format(bits, f"0{cells}b").encode().translate(BINARY_DIGITS)
+
+
+# Таблица для translate: символы "0"/"1" -> байты 0/1
+BINARY_DIGITS = bytes(int(b == ord("1")) for b in range(256))
+
+
+def open_mapped(path, writable=False):
+    """Открыть игру без чтения файла целиком: поле работает прямо поверх
+    mmap, с диска читаются только страницы клеток, к которым обращаются.
+    writable=True - ходы записываются в файл, иначе остаются в памяти"""
+    with open(path, "r+b" if writable else "rb") as source:
+        # Пустой файл mmap не откроет - та же ошибка, что и у load
+        if os.fstat(source.fileno()).st_size < HEADER.size:
+            raise StorageError("файл слишком короткий")
+        buffer = mmap.mmap(source.fileno(), 0,
+                           access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_COPY)
+    header = read_header(buffer)
+    if header["state"] & FIRST_CLICK:
+        # Мин еще нет, а расставить их поверх карт нельзя - поле пустое, грузим обычно
+        buffer.close()
+        return load(path)
+    field = MappedBoard(header["rows"], header["cols"], buffer, HEADER.size, header["bitmap"],
+                        header["topology"])
+    game = restore(header, field, buffer)
+    game.mine_cells = MappedMines(field.data, header["mines"])
+    return game
+
+
+class MappedCells:
+    """Байты клеток поверх трех битовых карт: байт клетки собирается при
+    обращении, число мин вокруг считается по карте мин (соседи - из таблицы
+    поля). Менять можно только биты REVEALED и FLAG - мины уже расставлены"""
+    __slots__ = ("buffer", "size", "table", "mines", "revealed", "flags")
+
+    def __init__(self, buffer, size, table, start, bitmap):
+        self.buffer = buffer
+        self.size = size
+        self.table = table
+        self.mines = start
+        self.revealed = start + bitmap
+        self.flags = start + 2 * bitmap
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, i):
+        buffer = self.buffer
+        byte, bit = i >> 3, 0x80 >> (i & 7)
+        mines = self.mines
+        if buffer[mines + byte] & bit:
+            value = MINE
+        else:
+            value = 0
+            for j in self.table[i]:
+                if buffer[mines + (j >> 3)] & (0x80 >> (j & 7)):
+                    value += 1
+        if buffer[self.revealed + byte] & bit:
+            value |= REVEALED
+        if buffer[self.flags + byte] & bit:
+            value |= FLAG
+        return value
+
+    def __setitem__(self, i, value):
+        buffer = self.buffer
+        byte, bit = i >> 3, 0x80 >> (i & 7)
+        for start, mask in ((self.revealed, REVEALED), (self.flags, FLAG)):
+            if value & mask:
+                buffer[start + byte] |= bit
+            else:
+                buffer[start + byte] &= ~bit & 0xFF
+
+    def translate(self, table):
+        """Как bytes.translate (проходит все поле - только для редких случаев)"""
+        return bytes(table[self[i]] for i in range(self.size))
+
+
+class MappedBoard(Board):
+    """Board поверх битовых карт в mmap (или другом буфере)"""
+    __slots__ = ()
+
+    def __init__(self, rows, cols, buffer, start, bitmap, topology=FLAT):
+        self.rows = rows
+        self.cols = cols
+        self.topology = topology
+        self.table = neighbour_table(rows, cols, topology)
+        self.data = MappedCells(buffer, rows * cols, self.table, start, bitmap)
+
+    def packed(self, mask):
+        data = self.data
+        start = {MINE: data.mines, REVEALED: data.revealed, FLAG: data.flags}.get(mask)
+        if start is None:
+            return pack_bits(data, mask)
+        bitmap = (data.size + 7) // 8
+        return bytes(data.buffer[start:start + bitmap])
+
+    def copy(self):
+        """Копия в памяти: те же три битовые карты, без распаковки"""
+        data = self.data
+        bitmap = (data.size + 7) // 8
+        buffer = bytearray(data.buffer[data.mines:data.mines + 3 * bitmap])
+        return MappedBoard(self.rows, self.cols, buffer, 0, bitmap, self.topology)
+
+
+class MappedMines:
+    """Список мин поля из карты мин, без хранения в памяти"""
+
+    def __init__(self, data, count):
+        self.data = data
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        data = self.data
+        buffer, start = data.buffer, data.mines
+        for byte in range((data.size + 7) // 8):
+            bits = buffer[start + byte]
+            while bits:
+                high = bits.bit_length() - 1
+                bits ^= 1 << high
+                yield byte * 8 + 7 - high
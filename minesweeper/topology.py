@@ -0,0 +1,85 @@
+"""Соседство клеток: таблицы соседей для каждой формы поля.
+
+table[i] - кортеж индексов соседей клетки i. Таблица строится один раз
+на форму поля (rows, cols, topology) и берется из кэша, поэтому ходы
+не считают соседей заново и не строят временных списков. Таблица целиком
+стоит около 140 байт на клетку, поэтому строится только для небольших
+полей - на больших соседи внутренних клеток считаются сложением, а
+хранятся только края (LazyNeighbours).
+"""
+from functools import lru_cache
+
+FLAT = "flat"  # обычное поле с краями
+TORUS = "torus"  # противоположные края склеены, у каждой клетки 8 соседей
+TOPOLOGIES = (FLAT, TORUS)
+
+# Сколько таблиц держать в кэше и до какого размера поля строить таблицу
+# целиком (около 140 байт на клетку: 64x64 - ~0.6 МБ и ~5 мс на постройку)
+TABLE_CACHE_SIZE = 8
+TABLE_MAX_CELLS = 4096
+
+
+def cell_neighbours(rows, cols, topology, i):
+    """Соседи одной клетки по порядку строк (без таблицы)"""
+    r, c = divmod(i, cols)
+    if topology == TORUS:
+        # На узком торе сосед может повториться или совпасть с самой клеткой
+        around = dict.fromkeys(((r + dr) % rows) * cols + (c + dc) % cols
+                               for dr in (-1, 0, 1) for dc in (-1, 0, 1))
+        around.pop(i, None)
+        return tuple(around)
+    return tuple(nr * cols + nc
+                 for nr in range(max(r - 1, 0), min(r + 2, rows))
+                 for nc in range(max(c - 1, 0), min(c + 2, cols))
+                 if nr != r or nc != c)
+
+
+@lru_cache(maxsize=TABLE_CACHE_SIZE)
+def neighbour_table(rows, cols, topology=FLAT):
+    """Таблица соседей поля: список кортежей или LazyNeighbours для больших полей"""
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"неизвестная форма поля: {topology}")
+    cells = rows * cols
+    if cells > TABLE_MAX_CELLS:
+        return LazyNeighbours(rows, cols, topology)
+
+    # Кортежи собираются из срезов одного списка индексов: одинаковые
+    # числа в разных кортежах - один и тот же объект, а не копии
+    ids = list(range(cells))
+    table = [None] * cells
+    for r in range(rows):
+        inner = 0 < r < rows - 1
+        for c in range(cols):
+            i = r * cols + c
+            if inner and 0 < c < cols - 1:
+                above, below = i - cols, i + cols
+                table[i] = tuple(ids[above - 1:above + 2] + ids[i - 1:i + 2:2] + ids[below - 1:below + 2])
+            else:
+                table[i] = tuple(ids[j] for j in cell_neighbours(rows, cols, topology, i))
+    return table
+
+
+class LazyNeighbours:
+    """Таблица соседей большого поля без хранения: внутренняя клетка -
+    восемь сдвигов индекса, клетки краев (их мало) считаются один раз"""
+    __slots__ = ("rows", "cols", "topology", "edges")
+
+    def __init__(self, rows, cols, topology):
+        self.rows = rows
+        self.cols = cols
+        self.topology = topology
+        self.edges = {}
+
+    def __len__(self):
+        return self.rows * self.cols
+
+    def __getitem__(self, i):
+        cols = self.cols
+        r, c = divmod(i, cols)
+        if 0 < r < self.rows - 1 and 0 < c < cols - 1:
+            above, below = i - cols, i + cols
+            return (above - 1, above, above + 1, i - 1, i + 1, below - 1, below, below + 1)
+        around = self.edges.get(i)
+        if around is None:
+            around = self.edges[i] = cell_neighbours(self.rows, cols, self.topology, i)
+        return around
@@ -0,0 +1,29 @@
+"""Бесконечное поле: открытие кончается, куски не копятся сверх max_chunks"""
+import pytest
+
+from minesweeper.board import REVEALED
+from minesweeper.endless import CHUNK_CELLS, MIN_DENSITY, EndlessGame
+
+
+def test_density_limits():
+    with pytest.raises(ValueError):
+        EndlessGame(0, MIN_DENSITY / 2)
+
+
+def test_first_reveal_at_min_density():
+    for seed in range(50):
+        game = EndlessGame(seed, MIN_DENSITY, max_chunks=16)
+        opened = game.reveal(0, 0)
+        assert opened and game.revealed_count == len(opened)
+        assert len(game.chunks) <= 16
+
+
+def test_flood_evicts_chunks_while_running():
+    # Ниже MIN_DENSITY в обход проверки: одна заливка проходит ~130 кусков
+    game = EndlessGame(0, max_chunks=16)
+    game.chunk_mine_count = round(CHUNK_CELLS * 0.1)
+    opened = game.reveal(0, 0)
+    assert len(opened) > 50000 and game.revealed_count == len(opened)
+    assert len(game.chunks) <= 16 and game.reloaded
+    # Ходы вытесненных кусков не потерялись
+    assert all(game.cell(r, c) & REVEALED for r, c in opened[::50])
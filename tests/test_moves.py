@@ -0,0 +1,106 @@
+"""Пачки ходов (apply_moves) и аккорд"""
+import pytest
+
+from minesweeper.board import COUNT_MASK, FLAG, MINE, REVEALED
+from minesweeper.engine import (ACTION_CHORD, ACTION_FLAG, ACTION_REVEAL, LOST, PLAYING,
+                                MinesweeperGame)
+
+
+def opened(seed=1):
+    """Игра 16x30 после первого открытия в центре"""
+    game = MinesweeperGame(16, 30, 99, seed=seed)
+    game.new_game()
+    game.reveal(8, 15)
+    return game
+
+
+def numbers(game):
+    """Открытые числа с закрытыми соседями: (клетка, соседние мины, остальные закрытые)"""
+    data, table = game.field.data, game.field.table
+    for i in range(len(data)):
+        if data[i] & (REVEALED | MINE) == REVEALED and data[i] & COUNT_MASK:
+            mines = [j for j in table[i] if data[j] & MINE]
+            safe = [j for j in table[i] if not data[j] & (MINE | REVEALED)]
+            if safe:
+                yield i, mines, safe
+
+
+def test_skips_off_board_and_no_op_moves():
+    game = opened()
+    data = game.field.data
+    before = bytes(data)
+    shown = data.index(next(b for b in data if b & REVEALED))
+    hidden = next(i for i in range(len(data)) if not data[i] & REVEALED)
+    moves = [(ACTION_REVEAL, -1, 0), (ACTION_FLAG, 0, 30), (ACTION_CHORD, 16, 5),
+             (ACTION_REVEAL, *divmod(shown, 30)), (ACTION_FLAG, *divmod(shown, 30)),
+             (ACTION_CHORD, *divmod(hidden, 30))]
+    delta = game.apply_moves(moves)
+    assert delta["applied"] == 0 and delta["changed"] == []
+    assert delta["result"] == PLAYING and bytes(data) == before
+    with pytest.raises(ValueError):
+        game.apply_moves([("jump", 0, 0)])
+
+
+def test_applied_count_and_no_repeated_cells():
+    game = opened()
+    data = game.field.data
+    safe = [i for i in range(len(data)) if not data[i] & (MINE | REVEALED)]
+    flag = divmod(safe[0], 30)
+    # Флаг ставится и снимается, затем ставится снова: клетка в итоге одна
+    moves = [(ACTION_FLAG, *flag), (ACTION_FLAG, *flag), (ACTION_FLAG, *flag),
+             (ACTION_REVEAL, *divmod(safe[-1], 30))]
+    delta = game.apply_moves(moves)
+    assert delta["applied"] == 4
+    assert delta["changed"].count(flag) == 1
+    assert len(delta["changed"]) == len(set(delta["changed"]))
+    assert delta["flags"] == 1 and data[safe[0]] & FLAG
+
+
+def test_batch_stops_after_game_end():
+    game = opened()
+    data = game.field.data
+    safe = next(i for i in range(len(data)) if not data[i] & (MINE | REVEALED))
+    mine = divmod(game.mine_cells[0], 30)
+    delta = game.apply_moves([(ACTION_REVEAL, *mine), (ACTION_REVEAL, *divmod(safe, 30)),
+                              (ACTION_FLAG, *divmod(safe, 30))])
+    assert delta["result"] == LOST and delta["applied"] == 1
+    assert not data[safe] & (REVEALED | FLAG)
+    # Все мины открыты в том же итоге, каждая один раз
+    assert sorted(delta["changed"]) == sorted(set(delta["changed"]))
+    assert {game.field.cell(i) for i in game.mine_cells} <= set(delta["changed"])
+    assert game.apply_moves([(ACTION_REVEAL, *divmod(safe, 30))])["applied"] == 0
+
+
+def test_chord_opens_neighbours_of_flagged_number():
+    for seed in range(20):
+        game = opened(seed)
+        for i, mines, safe in numbers(game):
+            if mines:
+                break
+        else:
+            continue
+        for j in mines:
+            game.toggle_flag(*divmod(j, 30))
+        delta = game.apply_moves([(ACTION_CHORD, *divmod(i, 30))])
+        assert delta["result"] != LOST and delta["applied"] == 1
+        assert all(game.field.data[j] & REVEALED for j in safe)
+        return
+    raise AssertionError("нет подходящего числа")
+
+
+def test_chord_with_wrong_flag_loses():
+    for seed in range(20):
+        game = opened(seed)
+        for i, mines, safe in numbers(game):
+            if mines and len(safe) >= len(mines):
+                break
+        else:
+            continue
+        # Флаги на безопасных клетках вместо мин: аккорд открывает мину
+        for j in safe[:len(mines)]:
+            game.toggle_flag(*divmod(j, 30))
+        delta = game.apply_moves([(ACTION_CHORD, *divmod(i, 30))])
+        assert delta["result"] == LOST and game.game_over
+        assert game.exploded in mines
+        return
+    raise AssertionError("нет подходящего числа")
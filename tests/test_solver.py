@@ -0,0 +1,112 @@
+"""Решатель: выводы не ошибаются, пока флаги игрока верные"""
+import random
+from itertools import combinations
+from math import comb
+
+from minesweeper.board import COUNT_MASK, FLAG, MINE, REVEALED
+from minesweeper.engine import MinesweeperGame
+
+
+def started(seed, rows=16, cols=30, mines=99, moves=8):
+    """Игра после первого клика и нескольких безопасных открытий"""
+    rnd = random.Random(seed)
+    game = MinesweeperGame(rows, cols, mines, seed=seed)
+    game.new_game()
+    game.reveal(rows // 2, cols // 2)
+    data = game.field.data
+    for _ in range(moves):
+        hidden = [i for i in range(rows * cols) if not data[i] & (MINE | REVEALED | FLAG)]
+        if not hidden:
+            break
+        game.reveal(*divmod(rnd.choice(hidden), cols))
+    return game, rnd
+
+
+def assert_sound(game):
+    """Безопасные клетки - не мины (флаги решателя проверяем отдельно)"""
+    data = game.field.data
+    assert not [i for i in game.safe_cells if data[i] & MINE]
+
+
+def test_correct_flags_give_correct_deductions():
+    for seed in range(100):
+        game, rnd = started(seed)
+        data = game.field.data
+        for _ in range(20):
+            if game.exploded is not None or game.check_win():
+                break
+            kind = rnd.random()
+            if kind < 0.3:
+                game.toggle_flag(*divmod(rnd.choice(game.mine_cells), game.cols))
+            elif kind < 0.7:
+                game.auto_flag()
+                assert_sound(game)
+                assert all(data[i] & MINE for i in range(len(data)) if data[i] & FLAG)
+            elif game.safe_cells:
+                game.reveal(*divmod(min(game.safe_cells), game.cols))
+                assert game.exploded is None
+
+
+def test_removed_wrong_flag_forgets_its_deductions():
+    # Неверные флаги, решатель, затем все неверные флаги снимаются:
+    # безопасные клетки, выведенные из них, не должны остаться
+    for seed in range(300):
+        game, rnd = started(seed)
+        data = game.field.data
+        hidden = [i for i in range(len(data)) if not data[i] & (MINE | REVEALED)]
+        wrong = rnd.sample(hidden, min(3, len(hidden)))
+        for i in wrong:
+            game.toggle_flag(*divmod(i, game.cols))
+        game.auto_flag()
+        for i in wrong:
+            game.toggle_flag(*divmod(i, game.cols))
+        assert_sound(game)
+
+        # После отката снятия флага выводы возвращаются как были
+        token = game.snapshot()
+        before = set(game.safe_cells)
+        game.toggle_flag(*divmod(wrong[0], game.cols))
+        game.toggle_flag(*divmod(wrong[0], game.cols))
+        game.restore(token)
+        assert game.safe_cells == before
+
+
+def enumerate_probabilities(game):
+    """Вероятности мин полным перебором расстановок в скрытых клетках"""
+    data = game.field.data
+    table = game.field.table
+    unknown = [i for i in range(len(data)) if not data[i] & (REVEALED | FLAG)]
+    numbers = [i for i in range(len(data)) if data[i] & (REVEALED | MINE) == REVEALED]
+    left = game.mines - game.flag_count
+    counts = dict.fromkeys(unknown, 0)
+    total = 0
+    for mines in combinations(unknown, left):
+        chosen = set(mines)
+        if all(sum(1 for j in table[i] if j in chosen or data[j] & FLAG) == data[i] & COUNT_MASK
+               for i in numbers):
+            total += 1
+            for i in mines:
+                counts[i] += 1
+    return {i: n / total for i, n in counts.items()}
+
+
+def test_probabilities_match_enumeration():
+    checked = 0
+    for seed in range(250):
+        game = started(seed, 6, 7, 7, moves=seed % 4)[0]
+        data = game.field.data
+        if game.exploded is not None or game.check_win():
+            continue
+        # Часть мин отмечена верными флагами
+        for i in game.mine_cells[:seed % 3]:
+            game.toggle_flag(*divmod(i, game.cols))
+        unknown = sum(1 for b in data if not b & (REVEALED | FLAG))
+        if comb(unknown, game.mines - game.flag_count) > 10000:
+            continue
+        expected = enumerate_probabilities(game)
+        probabilities, interior = game.mine_probabilities()
+        for i, p in expected.items():
+            got = probabilities.get(game.field.cell(i), interior)
+            assert abs(got - p) < 1e-9, (seed, i)
+        checked += 1
+    assert checked > 100
@@ -0,0 +1,101 @@
+"""Двоичное сохранение: загрузка (loads, open_mapped) дает ту же игру"""
+import random
+import struct
+
+import pytest
+
+from minesweeper import storage
+from minesweeper.engine import MinesweeperGame
+from minesweeper.topology import FLAT, TORUS
+
+
+def play(game, rnd, moves):
+    """Случайные ходы: открытия, флаги и авто-флаги, пока игра не кончилась"""
+    for _ in range(moves):
+        if game.exploded is not None or game.check_win():
+            break
+        r, c = rnd.randrange(game.rows), rnd.randrange(game.cols)
+        kind = rnd.random()
+        if kind < 0.6 or game.first_click:
+            game.reveal(r, c)
+        elif kind < 0.85:
+            game.toggle_flag(r, c)
+        else:
+            game.auto_flag()
+
+
+def state(game):
+    """Все, что сохраняется в файл"""
+    data = game.field.data
+    return {
+        "cells": bytes(data[i] for i in range(len(data))),
+        "mines": sorted(game.mine_cells),
+        "counts": (game.revealed_count, game.flag_count, game.hidden_count, game.exploded),
+        "flags": (game.game_over, game.first_click, game.game_started,
+                  game.hint_available, game.no_guess),
+        "shape": (game.rows, game.cols, game.mines, game.topology, game.seed),
+        "frontier": set(game.frontier),
+    }
+
+
+# 7x13 - число клеток не кратно 8; 80x80 - расстановка через NumPy, если он есть
+SHAPES = [(9, 9, 10, FLAT), (7, 13, 15, FLAT), (16, 30, 99, FLAT), (7, 13, 15, TORUS), (80, 80, 900, FLAT)]
+
+
+@pytest.mark.parametrize("rows, cols, mines, topology", SHAPES)
+@pytest.mark.parametrize("moves", [0, 1, 30])
+def test_round_trip(tmp_path, rows, cols, mines, topology, moves):
+    for seed in range(5):
+        game = MinesweeperGame(rows, cols, mines, seed=seed, topology=topology)
+        game.new_game()
+        play(game, random.Random(seed), moves)
+        expected = state(game)
+
+        assert state(storage.loads(storage.dumps(game))) == expected
+
+        path = tmp_path / f"{seed}.msw"
+        storage.save(game, path)
+        assert state(storage.load(path)) == expected
+        assert state(storage.open_mapped(path)) == expected
+
+
+def test_loaded_game_plays_on(tmp_path):
+    rnd = random.Random(1)
+    game = MinesweeperGame(16, 30, 99, seed=7)
+    game.new_game()
+    play(game, rnd, 10)
+    path = tmp_path / "game.msw"
+    storage.save(game, path)
+    for loaded in (storage.loads(storage.dumps(game)), storage.open_mapped(path)):
+        original = game.copy()
+        for _ in range(20):
+            r, c = rnd.randrange(16), rnd.randrange(30)
+            assert loaded.toggle_flag(r, c) == original.toggle_flag(r, c)
+            r, c = rnd.randrange(16), rnd.randrange(30)
+            assert loaded.reveal(r, c) == original.reveal(r, c)
+        assert state(loaded) == state(original)
+
+
+def test_bad_file(tmp_path):
+    with pytest.raises(storage.StorageError):
+        storage.loads(b"not a game")
+    empty = tmp_path / "empty.msw"
+    empty.write_bytes(b"")
+    for load in (storage.load, storage.open_mapped):
+        with pytest.raises(storage.StorageError):
+            load(empty)
+    data = storage.dumps(MinesweeperGame(9, 9, 10, seed=1))
+    with pytest.raises(storage.StorageError):
+        storage.loads(data[:-1])
+
+
+def test_frontier_is_little_endian():
+    game = MinesweeperGame(16, 30, 99, seed=2)
+    game.new_game()
+    game.reveal(8, 15)
+    data = storage.dumps(game)
+    header = storage.read_header(data)
+    start = storage.HEADER.size + 3 * header["bitmap"]
+    count = header["frontier"]
+    frontier = struct.unpack_from(f"<{count}Q", data, start)
+    assert list(frontier) == sorted(game.frontier) and count
@@ -0,0 +1,75 @@
+"""Откат по журналу изменений: restore(snapshot()) возвращает игру точно в прежнее состояние"""
+import random
+
+import pytest
+
+from minesweeper.engine import MinesweeperGame
+from minesweeper.topology import FLAT, TORUS
+
+
+def state(game):
+    """Поле, счетчики и индексы игры (все, что откатывает restore)"""
+    return (bytes(game.field.data), game.revealed_count, game.flag_count, game.hidden_count,
+            game.exploded, game.game_over, game.first_click, game.game_started, game.seed,
+            set(game.frontier), set(game.pending), set(game.safe_cells),
+            sorted(game.mine_cells), game.moves.tolist())
+
+
+def move(game, rnd):
+    """Один случайный ход, в том числе после проигрыша"""
+    r, c = rnd.randrange(game.rows), rnd.randrange(game.cols)
+    kind = rnd.random()
+    if kind < 0.5:
+        game.reveal(r, c)
+    elif kind < 0.75:
+        game.toggle_flag(r, c)
+    elif kind < 0.95:
+        game.auto_flag()
+    else:
+        game.show_all_mines()
+
+
+@pytest.mark.parametrize("rows, cols, mines, topology",
+                         [(9, 9, 10, FLAT), (12, 15, 30, FLAT), (12, 15, 30, TORUS), (80, 80, 900, FLAT)])
+def test_restore(rows, cols, mines, topology):
+    for seed in range(30):
+        rnd = random.Random(seed)
+        game = MinesweeperGame(rows, cols, mines, seed=seed, topology=topology)
+        game.new_game()
+        saved = []
+        for _ in range(60):
+            if rnd.random() < 0.3:
+                saved.append((game.snapshot(), state(game), game.copy()))
+            if saved and rnd.random() < 0.15:
+                # Откат к случайной точке: точки после нее недействительны
+                k = rnd.randrange(len(saved))
+                token, expected, copy = saved[k]
+                del saved[k:]
+                game.restore(token)
+                assert state(game) == expected
+
+                # После отката игра продолжается так же, как ее копия
+                for _ in range(3):
+                    step = rnd.getstate()
+                    move(game, rnd)
+                    rnd.setstate(step)
+                    move(copy, rnd)
+                    assert state(game) == state(copy)
+            else:
+                move(game, rnd)
+
+
+def test_restore_first_click():
+    game = MinesweeperGame(16, 30, 99, seed=3)
+    game.new_game()
+    token = game.snapshot()
+    expected = state(game)
+    game.reveal(8, 15)
+    game.auto_flag()
+    game.restore(token)
+    assert state(game) == expected
+    game.reveal(8, 15)
+    fresh = MinesweeperGame(16, 30, 99, seed=3)
+    fresh.new_game()
+    fresh.reveal(8, 15)
+    assert bytes(game.field.data) == bytes(fresh.field.data)